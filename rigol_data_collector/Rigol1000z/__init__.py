@@ -1,2 +1,3 @@
 from .rigol1000z import Rigol1000z
+from .capture import Capture, CaptureCancelled, TransferProgress, TransferSummary
 from .constants import *
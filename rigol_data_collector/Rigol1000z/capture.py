@@ -0,0 +1,211 @@
+"""
+This module contains the in-memory representation of a waveform download and the
+interface used to stream the download to a file while it is in progress.
+"""
+
+import numpy as _np
+from typing import List, Optional, Dict, Any
+from .commands import PreambleContext
+
+
+class Capture:
+    """
+    The raw BYTE samples of every channel downloaded from a single acquisition.
+
+    Samples are kept as uint8 (one byte per point); voltages are only computed on request.
+    """
+
+    def __init__(self, names: List[str], preambles: List[PreambleContext], raw: _np.ndarray,
+                 metadata: Dict[str, Any] = None, transfer: "TransferSummary" = None):
+        self.names: List[str] = names
+        """
+        Column labels of the captured channels, e.g. ["CH1", "CH3"]
+        """
+
+        self.preambles: List[PreambleContext] = preambles
+        """
+        The waveform preamble of each captured channel
+        """
+
+        self.raw: _np.ndarray = raw
+        """
+        uint8 array of shape (channels, points)
+        """
+
+        self.metadata: Dict[str, Any] = metadata if metadata is not None else {}
+        """
+        JSON-serializable information about the scope and its settings when the capture was taken
+        (see Rigol1000z.capture_metadata)
+        """
+
+        self.transfer: Optional[TransferSummary] = transfer
+        """
+        Statistics of the download from the scope, or None if the capture wasn't downloaded
+        by Rigol1000z.capture (e.g. loaded from a file)
+        """
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def points(self) -> int:
+        return self.raw.shape[1]
+
+    @property
+    def time_series(self) -> _np.ndarray:
+        if not self.preambles:
+            return _np.empty(0)
+        return self.preambles[0].time_series(self.points)
+
+    def voltage(self, i: int, dtype=_np.float64) -> _np.ndarray:
+        """
+        Voltages of the i-th captured channel (index into `names`, not the channel number).
+        """
+        return self.preambles[i].to_voltage(self.raw[i], dtype)
+
+    def voltages(self, dtype=_np.float64) -> List[_np.ndarray]:
+        return [self.voltage(i, dtype) for i in range(len(self))]
+
+
+class TransferProgress:
+    """
+    Passed to the progress callback of Rigol1000z.capture after each block of each channel.
+    """
+
+    def __init__(self, channel: str, points_done: int, points_total: int, bytes_transferred: int,
+                 mb_per_s: float, fraction: float):
+        self.channel: str = channel
+        """
+        Name of the channel the block was read from, e.g. "CH2"
+        """
+
+        self.points_done: int = points_done
+        """
+        Points of this channel downloaded so far
+        """
+
+        self.points_total: int = points_total
+        """
+        Points per channel in the capture
+        """
+
+        self.bytes_transferred: int = bytes_transferred
+        """
+        Bytes received from the scope so far, for all channels (including block headers)
+        """
+
+        self.mb_per_s: float = mb_per_s
+        """
+        Throughput of this block in MB/s (10^6 bytes per second)
+        """
+
+        self.fraction: float = fraction
+        """
+        Fraction of the whole capture (all channels) downloaded so far, from 0 to 1
+        """
+
+
+class TransferSummary:
+    """
+    Statistics of a completed download, used to spot slow or degraded links.
+    """
+
+    def __init__(self, channels: int, points: int, bytes_transferred: int, blocks: int,
+                 seconds: float, slowest_mb_per_s: float):
+        self.channels: int = channels
+        self.points: int = points
+        """
+        Points per channel
+        """
+
+        self.bytes_transferred: int = bytes_transferred
+        self.blocks: int = blocks
+        """
+        Number of `:wav:data?` reads, over all channels
+        """
+
+        self.seconds: float = seconds
+        """
+        Duration of the download, including the commands sent between reads
+        """
+
+        self.slowest_mb_per_s: float = slowest_mb_per_s
+        """
+        Throughput of the slowest block in MB/s
+        """
+
+    @property
+    def mb_per_s(self) -> float:
+        """
+        Average throughput of the download in MB/s
+        """
+        return self.bytes_transferred / self.seconds / 1e6 if self.seconds else 0.0
+
+    def __str__(self):
+        return (f"{self.channels} channels x {self.points:,} points: {self.bytes_transferred / 1e6:.1f} MB "
+                f"in {self.seconds:.2f} s ({self.mb_per_s:.2f} MB/s, "
+                f"slowest block {self.slowest_mb_per_s:.2f} MB/s)")
+
+
+class CaptureCancelled(Exception):
+    """
+    Raised by a progress callback to stop Rigol1000z.capture between blocks.
+    """
+
+
+class CaptureWriter:
+    """
+    Receives waveform blocks from Rigol1000z.capture as they are downloaded.
+
+    Blocks arrive in order and contain the same range of points for every captured channel,
+    so a writer can emit complete rows without holding the whole capture.
+    """
+
+    def open(self, names: List[str], preambles: List[PreambleContext], points: int,
+             metadata: Dict[str, Any] = None) -> Optional[_np.ndarray]:
+        """
+        Called once before the first block is downloaded.
+
+        :param names: Column labels of the captured channels
+        :param preambles: The waveform preamble of each captured channel
+        :param points: Number of points per channel
+        :param metadata: Information about the scope and its settings (see Capture.metadata)
+        :return: Optionally a uint8 array of shape (channels, points) that downloaded samples should
+            be stored in. If None, the capture allocates its own buffer.
+        """
+        return None
+
+    def write_block(self, start: int, block: _np.ndarray) -> None:
+        """
+        Called after each block has been downloaded for all channels.
+
+        :param start: Index of the first point in the block
+        :param block: uint8 array of shape (channels, block points)
+        """
+        pass
+
+    def close(self) -> None:
+        """
+        Called once after the last block has been written.
+        """
+        pass
+
+
+def write_capture(capture: Capture, writer: CaptureWriter, block_points: int = 250000) -> None:
+    """
+    Write a capture that has already been downloaded (or loaded from a file) with a writer,
+    one block at a time.
+
+    :param capture: The capture to write
+    :param writer: The writer to feed it to
+    :param block_points: Number of points per block
+    """
+    raw = writer.open(capture.names, capture.preambles, capture.points, capture.metadata)
+    try:
+        for start in range(0, capture.points, block_points):
+            block = capture.raw[:, start:start + block_points]
+            if raw is not None:
+                raw[:, start:start + block_points] = block
+            writer.write_block(start, block)
+    finally:
+        writer.close()
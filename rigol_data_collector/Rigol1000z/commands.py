@@ -7,7 +7,7 @@ import numpy as _np
 import pyvisa as _visa
 from .rigol1000zcommandmenu import Rigol1000zCommandMenu
 from .constants import *
-from typing import List, Union, Iterable
+from typing import Callable, Dict, List, Tuple, Union, Iterable
 
 
 class Channel(Rigol1000zCommandMenu):
@@ -837,27 +837,75 @@ class MeasureSetup(Rigol1000zCommandMenu):
         self.visa_write(f':dsb {val}')
 
 
-class MeasurementStatisticItem(Rigol1000zCommandMenu):
+_MEASURE_ITEM_SOURCES = {
+    has_digital: {
+        item: frozenset({*sources_analog, *sources_math, *(sources_digital if has_digital and info.digital else ())})
+        for item, info in measure_item_info.items()
+    }
+    for has_digital in (False, True)
+}
+"""
+The sources each measurement item accepts, on models without and with digital channels
+"""
+
+
+class _MeasurementItemMenu(Rigol1000zCommandMenu):
+    """
+    Validation shared by MeasurementItem and MeasurementStatisticItem.  Their get_<name> and
+    set_<name> methods are generated from measure_item_info (see _add_item_methods).
+    """
+
+    def __init__(self, visa_resource: _visa.Resource, idn: str = None):
+        super().__init__(visa_resource, idn)
+        self._item_sources = _MEASURE_ITEM_SOURCES[self.has_digital]
+
+    def _check_sources(self, item: str, sources: Tuple[str, ...]) -> None:
+        assert len(sources) == measure_item_info[item].sources
+        for source in sources:
+            assert source in self._item_sources[item]
+
+    @staticmethod
+    def _result(item: str, answer: str, integral: bool = True):
+        """
+        Parse a result: NaN if the scope couldn't measure the item (see Measure.invalid_result),
+        otherwise of the item's result type, unless `integral` is False (averages and deviations
+        of counts have fractions)
+        """
+        val = float(answer)
+        if val >= Measure.invalid_result:
+            return _np.nan
+        return measure_item_info[item].result_type(val) if integral else val
+
+    def set(self, item: str, *sources: str) -> None:
+        """
+        Turn on the measurement (or its statistic) of an item.
+
+        :param item: The item, one of EMeasureItem
+        :param sources: The source, or two sources for delays and phases
+        """
+        self._check_sources(item, sources)
+        self.visa_write(f" {item},{','.join(sources)}")
+
+
+class MeasurementStatisticItem(_MeasurementItemMenu):
     """
     Enable the statistic function of any waveform parameter of the specified source,
     or query the statistic result of any waveform parameter of the specified source.
 
-    This class was written to simply the logic of this function as there are many rules.
     All sources must be given when a query is called (no default args)
     """
     cmd_hierarchy_str = ":meas:stat:item"
 
-    def _statistic_item_write(self, item, source) -> None:
-        self.visa_write(f" {item},{source}")
-
-    def _statistic_item_query(self, stat_measurement_type, item, source) -> float:
+    def get(self, stat_measurement_type: str, item: str, *sources: str):
         """
-        Ensures that the statistic type is valid then builds and calls the visa query
+        Query a statistic of an item.
 
-        :param stat_measurement_type:
-        :param item:
-        :param source:
-        :return:
+        :param stat_measurement_type: One of EMeasurementStatisticItemType
+        :param item: The item, one of EMeasureItem
+        :param sources: The source, or two sources for delays and phases
+        :return: The statistic, of the item's result type (see measure_item_info) for the maximum,
+            minimum and current value, a float for the average and deviation, or NaN if the
+            scope couldn't measure the item
         """
         assert stat_measurement_type in {
             EMeasurementStatisticItemType.Maximum, EMeasurementStatisticItemType.Minimum,
@@ -865,655 +913,11 @@ class MeasurementStatisticItem(Rigol1000zCommandMenu):
             EMeasurementStatisticItemType.Average,
             EMeasurementStatisticItemType.Deviation
         }
-        return float(self.visa_ask(f"? {stat_measurement_type},{item},{source}"))
-
-    # region single source commands
-
-    # Voltage Maximum
-    def get_voltage_max(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.VoltageMax,
-            source
-        )
-
-    def set_voltage_max(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.VoltageMax,
-            source
-        )
-
-    # Voltage Minimum
-    def get_voltage_min(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.VoltageMin,
-            source
-        )
-
-    def set_voltage_min(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.VoltageMin,
-            source
-        )
-
-    # Voltage peak to peak
-    def get_voltage_peak_to_peak(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.VoltagePeakToPeak,
-            source
-        )
-
-    def set_voltage_peak_to_peak(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.VoltagePeakToPeak,
-            source
-        )
-
-    # Voltage Top
-    def get_voltage_top(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.VoltageTop,
-            source
-        )
-
-    def set_voltage_top(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.VoltageTop,
-            source
-        )
-
-    # Voltage Base
-    def get_voltage_base(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.VoltageBase,
-            source
-        )
-
-    def set_voltage_base(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.VoltageBase,
-            source
-        )
-
-    # Voltage Amplitude
-    def get_voltage_amp(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.VoltageAmplitude,
-            source
-        )
-
-    def set_voltage_amp(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.VoltageAmplitude,
-            source
-        )
-
-    # Voltage Average
-    def get_voltage_average(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.VoltageAverage,
-            source
-        )
-
-    def set_voltage_average(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.VoltageAverage,
-            source
-        )
-
-    # Voltage RMS
-    def get_voltage_rms(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.VoltageRMS,
-            source
-        )
-
-    def set_voltage_rms(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.VoltageRMS,
-            source
-        )
-
-    # Voltage Overshoot
-    def get_voltage_overshoot(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.VoltageOvershoot,
-            source
-        )
-
-    def set_voltage_overshoot(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.VoltageOvershoot,
-            source
-        )
-
-    # Area
-    def get_area(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.Area,
-            source
-        )
-
-    def set_area(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.Area,
-            source
-        )
-
-    # Period Area
-    def get_period_area(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.AreaPeriod,
-            source
-        )
-
-    def set_period_area(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.AreaPeriod,
-            source
-        )
-
-    # Preshoot
-    def get_preshoot(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.VoltagePreshoot,
-            source
-        )
-
-    def set_preshoot(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.VoltagePreshoot,
-            source
-        )
-
-    # period
-    def get_period(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.Period,
-            source
-        )
-
-    def set_period(self, source: str):
-        assert self.source_valid(source, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.Period,
-            source
-        )
-
-    # frequency
-    def get_frequency(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.Frequency,
-            source
-        )
-
-    def set_frequency(self, source: str):
-        assert self.source_valid(source, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.Frequency,
-            source
-        )
-
-    # rise time
-    def get_rise_time(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.RiseTime,
-            source
-        )
-
-    def set_rise_time(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.RiseTime,
-            source
-        )
-
-    # fall time
-    def get_fall_time(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.FallTime,
-            source
-        )
-
-    def set_fall_time(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.FallTime,
-            source
-        )
-
-    # width positive
-    def get_width_positive(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.WidthPositive,
-            source
-        )
-
-    def set_width_positive(self, source: str):
-        assert self.source_valid(source, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.WidthPositive,
-            source
-        )
-
-    # width negative
-    def get_width_negative(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.WidthNegative,
-            source
-        )
-
-    def set_width_negative(self, source: str):
-        assert self.source_valid(source, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.WidthNegative,
-            source
-        )
-
-    # duty positive
-    def get_duty_positive(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.DutyPositive,
-            source
-        )
-
-    def set_duty_positive(self, source: str):
-        assert self.source_valid(source, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.DutyPositive,
-            source
-        )
-
-    # duty negative
-    def get_duty_negative(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.DutyNegative,
-            source
-        )
-
-    def set_duty_negative(self, source: str):
-        assert self.source_valid(source, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.DutyNegative,
-            source
-        )
-
-    # time_voltage_max
-    def get_time_voltage_max(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.TVMax,
-            source
-        )
-
-    def set_time_voltage_max(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.TVMin,
-            source
-        )
-
-    # time_voltage_min
-    def get_time_voltage_min(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.TVMin,
-            source
-        )
-
-    def set_time_voltage_min(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.TVMin,
-            source
-        )
-
-    # Slew rate max
-    def get_slew_rate_positive(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.SlewRatePositive,
-            source
-        )
-
-    def set_slew_rate_positive(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.SlewRatePositive,
-            source
-        )
-
-    # Slew rate min
-    def get_slew_rate_negative(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.SlewRateNegative,
-            source
-        )
-
-    def set_slew_rate_negative(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.SlewRateNegative,
-            source
-        )
-
-    # Upper Voltage
-    def get_voltage_upper(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.VoltageUpper,
-            source
-        )
-
-    def set_voltage_upper(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.VoltageUpper,
-            source
-        )
-
-    # Middle Voltage
-    def get_voltage_mid(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.VoltageMid,
-            source
-        )
-
-    def set_voltage_mid(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.VoltageMid,
-            source
-        )
-
-    # Lower Voltage
-    def get_voltage_lower(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.VoltageLower,
-            source
-        )
-
-    def set_voltage_lower(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.VoltageLower,
-            source
-        )
-
-    # Variance
-    def get_variance(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.Variance,
-            source
-        )
-
-    def set_variance(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.Variance,
-            source
-        )
-
-    # Variance
-    def get_voltage_rms_period(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.VRmsPeriod,
-            source
-        )
-
-    def set_voltage_rms_period(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.VRmsPeriod,
-            source
-        )
-
-    # Pulses Positive
-    def get_pules_positive(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.PulsesPositive,
-            source
-        )
-
-    def set_pules_positive(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.PulsesPositive,
-            source
-        )
-
-    # Pulses Negative
-    def get_pules_negative(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.PulsesPositive,
-            source
-        )
-
-    def set_pules_negative(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.PulsesPositive,
-            source
-        )
-
-    # Edges Positive
-    def get_edges_positive(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.EdgesPositive,
-            source
-        )
-
-    def set_edges_positive(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.EdgesPositive,
-            source
-        )
-
-    # Edges Negative
-    def get_edges_negative(self, source: str, stat_measurement_type: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.EdgesNegative,
-            source
-        )
-
-    def set_edges_negative(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._statistic_item_write(
-            EMeasureItem.EdgesNegative,
-            source
-        )
-
-    # endregion
-
-    # region double source commands
-    # Rise Delay
-    def get_rise_delay(self, source_1: str, source_2: str, stat_measurement_type: str):
-        assert self.source_valid(source_1, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-        assert self.source_valid(source_2, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.DelayRise,
-            f"{source_1},{source_2}"
-        )
-
-    def set_rise_delay(self, source_1: str, source_2: str):
-        assert self.source_valid(source_1, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-        assert self.source_valid(source_2, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-
-        self._statistic_item_write(
-            EMeasureItem.DelayRise,
-            f"{source_1},{source_2}"
-        )
-
-    # Fall Delay
-    def get_fall_delay(self, source_1: str, source_2: str, stat_measurement_type: str):
-        assert self.source_valid(source_1, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-        assert self.source_valid(source_2, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.DelayFall,
-            f"{source_1},{source_2}"
-        )
-
-    def set_fall_delay(self, source_1: str, source_2: str):
-        assert self.source_valid(source_1, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-        assert self.source_valid(source_2, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-
-        self._statistic_item_write(
-            EMeasureItem.DelayFall,
-            f"{source_1},{source_2}"
-        )
-
-    # Rise Phase
-    def get_rise_phase(self, source_1: str, source_2: str, stat_measurement_type: str):
-        assert self.source_valid(source_1, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-        assert self.source_valid(source_2, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.PhaseRise,
-            f"{source_1},{source_2}"
-        )
-
-    def set_rise_phase(self, source_1: str, source_2: str):
-        assert self.source_valid(source_1, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-        assert self.source_valid(source_2, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-
-        self._statistic_item_write(
-            EMeasureItem.PhaseRise,
-            f"{source_1},{source_2}"
-        )
-
-    # Fall Phase
-    def get_fall_phase(self, source_1: str, source_2: str, stat_measurement_type: str):
-        assert self.source_valid(source_1, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-        assert self.source_valid(source_2, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-
-        self._statistic_item_query(
-            stat_measurement_type,
-            EMeasureItem.PhaseFall,
-            f"{source_1},{source_2}"
-        )
-
-    def set_fall_phase(self, source_1: str, source_2: str):
-        assert self.source_valid(source_1, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-        assert self.source_valid(source_2, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-
-        self._statistic_item_write(
-            EMeasureItem.PhaseFall,
-            f"{source_1},{source_2}"
-        )
-
-    # endregion
+        self._check_sources(item, sources)
+        answer = self.visa_ask(f"? {stat_measurement_type},{item},{','.join(sources)}")
+        return self._result(item, answer, integral=stat_measurement_type not in {
+            EMeasurementStatisticItemType.Average, EMeasurementStatisticItemType.Deviation
+        })
 
 
 class MeasurementStatistic(Rigol1000zCommandMenu):
@@ -1583,640 +987,74 @@ class MeasurementStatistic(Rigol1000zCommandMenu):
         # todo: what the fuck is item (pg 145)
 
 
-class MeasurementItem(Rigol1000zCommandMenu):
+class MeasurementItem(_MeasurementItemMenu):
     """
     Measure any waveform parameter of the specified source,
     or query the measurement result of any waveform parameter of the specified source.
 
-    This class was written to simply the logic of this function as there are many rules.
     All sources must be given when a query is called (no default args)
     """
     cmd_hierarchy_str = ":meas:item"
 
-    def _item_write(self, item, source) -> None:
-        self.visa_write(f" {item},{source}")
-
-    def _item_query(self, item, source) -> float:
+    def get(self, item: str, *sources: str):
         """
-        Ensures that the statistic type is valid then builds and calls the visa query
+        Query the result of an item.
 
-        :param item:
-        :param source:
-        :return:
+        :param item: The item, one of EMeasureItem
+        :param sources: The source, or two sources for delays and phases
+        :return: The result, of the item's result type (see measure_item_info), or NaN if the
+            scope couldn't measure the item
         """
+        self._check_sources(item, sources)
+        return self._result(item, self.visa_ask(f"? {item},{','.join(sources)}"))
 
-        return float(self.visa_ask(f"? {item},{source}"))
-
-    # region single source commands
-
-    # Voltage Maximum
-    def get_voltage_max(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.VoltageMax,
-            source
-        )
-
-    def set_voltage_max(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.VoltageMax,
-            source
-        )
-
-    # Voltage Minimum
-    def get_voltage_min(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.VoltageMin,
-            source
-        )
-
-    def set_voltage_min(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.VoltageMin,
-            source
-        )
-
-    # Voltage peak to peak
-    def get_voltage_peak_to_peak(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.VoltagePeakToPeak,
-            source
-        )
-
-    def set_voltage_peak_to_peak(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.VoltagePeakToPeak,
-            source
-        )
-
-    # Voltage Top
-    def get_voltage_top(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.VoltageTop,
-            source
-        )
-
-    def set_voltage_top(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.VoltageTop,
-            source
-        )
-
-    # Voltage Base
-    def get_voltage_base(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.VoltageBase,
-            source
-        )
-
-    def set_voltage_base(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.VoltageBase,
-            source
-        )
-
-    # Voltage Amplitude
-    def get_voltage_amp(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.VoltageAmplitude,
-            source
-        )
-
-    def set_voltage_amp(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.VoltageAmplitude,
-            source
-        )
-
-    # Voltage Average
-    def get_voltage_average(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.VoltageAverage,
-            source
-        )
-
-    def set_voltage_average(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.VoltageAverage,
-            source
-        )
-
-    # Voltage RMS
-    def get_voltage_rms(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.VoltageRMS,
-            source
-        )
-
-    def set_voltage_rms(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.VoltageRMS,
-            source
-        )
-
-    # Voltage Overshoot
-    def get_voltage_overshoot(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.VoltageOvershoot,
-            source
-        )
-
-    def set_voltage_overshoot(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.VoltageOvershoot,
-            source
-        )
-
-    # Area
-    def get_area(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.Area,
-            source
-        )
-
-    def set_area(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.Area,
-            source
-        )
-
-    # Period Area
-    def get_period_area(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.AreaPeriod,
-            source
-        )
-
-    def set_period_area(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.AreaPeriod,
-            source
-        )
-
-    # Preshoot
-    def get_preshoot(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.VoltagePreshoot,
-            source
-        )
-
-    def set_preshoot(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.VoltagePreshoot,
-            source
-        )
-
-    # period
-    def get_period(self, source: str):
-        assert self.source_valid(source, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.Period,
-            source
-        )
-
-    def set_period(self, source: str):
-        assert self.source_valid(source, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.Period,
-            source
-        )
-
-    # frequency
-    def get_frequency(self, source: str):
-        assert self.source_valid(source, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.Frequency,
-            source
-        )
-
-    def set_frequency(self, source: str):
-        assert self.source_valid(source, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.Frequency,
-            source
-        )
-
-    # rise time
-    def get_rise_time(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.RiseTime,
-            source
-        )
-
-    def set_rise_time(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.RiseTime,
-            source
-        )
-
-    # fall time
-    def get_fall_time(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.FallTime,
-            source
-        )
-
-    def set_fall_time(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.FallTime,
-            source
-        )
-
-    # width positive
-    def get_width_positive(self, source: str):
-        assert self.source_valid(source, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.WidthPositive,
-            source
-        )
-
-    def set_width_positive(self, source: str):
-        assert self.source_valid(source, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.WidthPositive,
-            source
-        )
-
-    # width negative
-    def get_width_negative(self, source: str):
-        assert self.source_valid(source, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.WidthNegative,
-            source
-        )
-
-    def set_width_negative(self, source: str):
-        assert self.source_valid(source, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.WidthNegative,
-            source
-        )
-
-    # duty positive
-    def get_duty_positive(self, source: str):
-        assert self.source_valid(source, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.DutyPositive,
-            source
-        )
-
-    def set_duty_positive(self, source: str):
-        assert self.source_valid(source, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.DutyPositive,
-            source
-        )
-
-    # duty negative
-    def get_duty_negative(self, source: str):
-        assert self.source_valid(source, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.DutyNegative,
-            source
-        )
-
-    def set_duty_negative(self, source: str):
-        assert self.source_valid(source, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.DutyNegative,
-            source
-        )
-
-    # time_voltage_max
-    def get_time_voltage_max(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.TVMax,
-            source
-        )
-
-    def set_time_voltage_max(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.TVMin,
-            source
-        )
-
-    # time_voltage_min
-    def get_time_voltage_min(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.TVMin,
-            source
-        )
-
-    def set_time_voltage_min(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.TVMin,
-            source
-        )
-
-    # Slew rate max
-    def get_slew_rate_positive(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
 
-        self._item_query(
-            EMeasureItem.SlewRatePositive,
-            source
-        )
-
-    def set_slew_rate_positive(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.SlewRatePositive,
-            source
-        )
-
-    # Slew rate min
-    def get_slew_rate_negative(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.SlewRateNegative,
-            source
-        )
-
-    def set_slew_rate_negative(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.SlewRateNegative,
-            source
-        )
-
-    # Upper Voltage
-    def get_voltage_upper(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.VoltageUpper,
-            source
-        )
-
-    def set_voltage_upper(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.VoltageUpper,
-            source
-        )
-
-    # Middle Voltage
-    def get_voltage_mid(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.VoltageMid,
-            source
-        )
-
-    def set_voltage_mid(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.VoltageMid,
-            source
-        )
-
-    # Lower Voltage
-    def get_voltage_lower(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.VoltageLower,
-            source
-        )
-
-    def set_voltage_lower(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.VoltageLower,
-            source
-        )
-
-    # Variance
-    def get_variance(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.Variance,
-            source
-        )
-
-    def set_variance(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.Variance,
-            source
-        )
-
-    # Variance
-    def get_voltage_rms_period(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.VRmsPeriod,
-            source
-        )
-
-    def set_voltage_rms_period(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.VRmsPeriod,
-            source
-        )
-
-    # Pulses Positive
-    def get_pules_positive(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.PulsesPositive,
-            source
-        )
-
-    def set_pules_positive(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.PulsesPositive,
-            source
-        )
-
-    # Pulses Negative
-    def get_pules_negative(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.PulsesPositive,
-            source
-        )
-
-    def set_pules_negative(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.PulsesPositive,
-            source
-        )
-
-    # Edges Positive
-    def get_edges_positive(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.EdgesPositive,
-            source
-        )
-
-    def set_edges_positive(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.EdgesPositive,
-            source
-        )
-
-    # Edges Negative
-    def get_edges_negative(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.EdgesNegative,
-            source
-        )
-
-    def set_edges_negative(self, source: str):
-        assert self.source_valid(source, digital_valid=False, ch_valid=True, math_valid=True)
-        self._item_write(
-            EMeasureItem.EdgesNegative,
-            source
-        )
-
-    # endregion
-
-    # region double source commands
-    # Rise Delay
-    def get_rise_delay(self, source_1: str, source_2: str):
-        assert self.source_valid(source_1, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-        assert self.source_valid(source_2, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.DelayRise,
-            f"{source_1},{source_2}"
-        )
-
-    def set_rise_delay(self, source_1: str, source_2: str):
-        assert self.source_valid(source_1, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-        assert self.source_valid(source_2, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-
-        self._item_write(
-            EMeasureItem.DelayRise,
-            f"{source_1},{source_2}"
-        )
-
-    # Fall Delay
-    def get_fall_delay(self, source_1: str, source_2: str):
-        assert self.source_valid(source_1, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-        assert self.source_valid(source_2, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.DelayFall,
-            f"{source_1},{source_2}"
-        )
-
-    def set_fall_delay(self, source_1: str, source_2: str):
-        assert self.source_valid(source_1, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-        assert self.source_valid(source_2, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-
-        self._item_write(
-            EMeasureItem.DelayFall,
-            f"{source_1},{source_2}"
-        )
-
-    # Rise Phase
-    def get_rise_phase(self, source_1: str, source_2: str):
-        assert self.source_valid(source_1, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-        assert self.source_valid(source_2, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-
-        self._item_query(
-            EMeasureItem.PhaseRise,
-            f"{source_1},{source_2}"
-        )
+def _item_methods(item: str, info: MeasureItemInfo, statistic: bool) -> Dict[str, Callable]:
+    """
+    The get_<name> and set_<name> methods of one item
+    """
+    if info.sources == 1:
+        if statistic:
+            def getter(self, source: str, stat_measurement_type: str):
+                return self.get(stat_measurement_type, item, source)
+        else:
+            def getter(self, source: str):
+                return self.get(item, source)
+
+        def setter(self, source: str):
+            self.set(item, source)
+    else:
+        if statistic:
+            def getter(self, source_1: str, source_2: str, stat_measurement_type: str):
+                return self.get(stat_measurement_type, item, source_1, source_2)
+        else:
+            def getter(self, source_1: str, source_2: str):
+                return self.get(item, source_1, source_2)
 
-    def set_rise_phase(self, source_1: str, source_2: str):
-        assert self.source_valid(source_1, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-        assert self.source_valid(source_2, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
+        def setter(self, source_1: str, source_2: str):
+            self.set(item, source_1, source_2)
 
-        self._item_write(
-            EMeasureItem.PhaseRise,
-            f"{source_1},{source_2}"
-        )
+    unit = f" ({info.unit})" if info.unit else ""
+    getter.__doc__ = f"Query the {'statistic' if statistic else 'result'} of {item}{unit}"
+    setter.__doc__ = f"Turn on the {'statistic' if statistic else 'measurement'} of {item}"
+    return {f"get_{info.name}": getter, f"set_{info.name}": setter}
 
-    # Fall Phase
-    def get_fall_phase(self, source_1: str, source_2: str):
-        assert self.source_valid(source_1, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-        assert self.source_valid(source_2, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
 
-        self._item_query(
-            EMeasureItem.PhaseFall,
-            f"{source_1},{source_2}"
-        )
+def _add_item_methods(cls: type, statistic: bool) -> None:
+    for item, info in measure_item_info.items():
+        for name, method in _item_methods(item, info, statistic).items():
+            method.__name__ = name
+            method.__qualname__ = f"{cls.__name__}.{name}"
+            setattr(cls, name, method)
+    # misspelled names of earlier versions
+    cls.get_pules_positive = cls.get_pulses_positive
+    cls.set_pules_positive = cls.set_pulses_positive
+    cls.get_pules_negative = cls.get_pulses_negative
+    cls.set_pules_negative = cls.set_pulses_negative
 
-    def set_fall_phase(self, source_1: str, source_2: str):
-        assert self.source_valid(source_1, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
-        assert self.source_valid(source_2, digital_valid=self.has_digital, ch_valid=True, math_valid=True)
 
-        self._item_write(
-            EMeasureItem.PhaseFall,
-            f"{source_1},{source_2}"
-        )
-
-    # endregion
+_add_item_methods(MeasurementStatisticItem, statistic=True)
+_add_item_methods(MeasurementItem, statistic=False)
 
 
 class Measure(Rigol1000zCommandMenu):
@@ -2230,6 +1068,11 @@ class Measure(Rigol1000zCommandMenu):
     """
     cmd_hierarchy_str = ":meas"
 
+    invalid_result = 9.9e37
+    """
+    The result the scope returns for an item it can't measure
+    """
+
     def __init__(self, visa_resource: _visa.Resource, idn: str = None):
         super().__init__(visa_resource, idn)
 
@@ -2341,6 +1184,37 @@ class Measure(Rigol1000zCommandMenu):
         """
         self.visa_write(f':ams {",".join(val)}')
 
+    def snapshot(self, items: Iterable[str] = None, sources: Iterable[str] = None,
+                 batch_size: int = 8) -> Dict[Tuple[str, str], float]:
+        """
+        Query many measurement items of many sources at once.
+
+        The `:meas:item?` queries are sent in batches (see visa_ask_many), so reading every
+        item of four channels takes 17 round trips instead of 132.
+
+        :param items: Single source items (EMeasureItem) to query.  Default is all of them.
+        :param sources: Sources to measure.  Default is the four analog channels.
+        :param batch_size: Number of queries per message.  Use 1 if the firmware doesn't
+            accept compound queries.
+        :return: The result of each (item, source), NaN where the scope can't measure the item
+        """
+        items = measure_items_single_source if items is None else tuple(items)
+        sources = (ESource.Ch1, ESource.Ch2, ESource.Ch3, ESource.Ch4) if sources is None else tuple(sources)
+        keys = [(item, source) for source in sources for item in items]
+        item_sources = _MEASURE_ITEM_SOURCES[self.has_digital]
+        for item, source in keys:
+            assert item in measure_items_single_source
+            assert source in item_sources[item]
+
+        answers = self.visa_ask_many(
+            [f"{self.cmd_hierarchy_str}:item? {item},{source}" for item, source in keys], batch_size
+        )
+        results = {}
+        for key, val in zip(keys, answers):
+            val = float(val)
+            results[key] = _np.nan if val >= self.invalid_result else val
+        return results
+
 
 # incomplete
 class Reference(Rigol1000zCommandMenu):
@@ -2506,6 +1380,13 @@ class Trigger(Rigol1000zCommandMenu):
         self.visa_write(':hold %.3e' % holdoff)
         return self.get_trigger_holdoff_s()
 
+    @property
+    def status(self) -> str:
+        """
+        The trigger status, one of the ETriggerStatus values
+        """
+        return self.visa_ask(':stat?').strip()
+
 
 class PreambleContext:
     """
@@ -2513,7 +1394,8 @@ class PreambleContext:
     """
 
     def __init__(self, preamble_str):
-        pre = preamble_str.split(',')
+        self.preamble_str: str = preamble_str.strip()
+        pre = self.preamble_str.split(',')
 
         self.format: int = int(pre[0])
         self.type: int = int(pre[1])
@@ -2526,6 +1408,28 @@ class PreambleContext:
         self.y_origin: float = float(pre[8])
         self.y_reference: float = float(pre[9])
 
+    def time_series(self, points: int = None) -> _np.ndarray:
+        """
+        Time of each sample relative to the first one (the layout used by the saved csv files).
+
+        :param points: Number of samples, defaults to the number of points in the preamble
+        :return: float64 array of sample times in seconds
+        """
+        if points is None:
+            points = self.points
+        return _np.arange(points) * self.x_increment
+
+    def to_voltage(self, data: _np.ndarray, dtype=_np.float64) -> _np.ndarray:
+        """
+        Convert raw BYTE samples into voltages.
+
+        :param data: uint8 samples as read from :wav:data?
+        :param dtype: Floating point type of the result
+        :return: Array of voltages
+        """
+        offset = self.y_origin + self.y_reference
+        return (data.astype(dtype) - dtype(offset)) * dtype(self.y_increment)
+
 
 class Waveform(Rigol1000zCommandMenu):
     """
@@ -2533,6 +1437,28 @@ class Waveform(Rigol1000zCommandMenu):
     """
     cmd_hierarchy_str = ":wav"
 
+    # order in which restore_read_settings applies the settings
+    _read_setting_names = ("mode", "source", "read_format", "read_start_point", "read_end_point")
+
+    def __init__(self, visa_resource):
+        super().__init__(visa_resource)
+        self.read_settings = {}
+        """
+        The source, mode, format and read points last set through this object, so they can be
+        restored if the scope is reconnected.  Settings made on the scope itself aren't included.
+        """
+
+    def restore_read_settings(self, settings: dict):
+        """
+        Apply read settings recorded by another Waveform object, e.g. the one used before the
+        scope was reconnected.
+
+        :param settings: The other object's read_settings
+        """
+        for name in self._read_setting_names:
+            if name in settings:
+                setattr(self, name, settings[name])
+
     @property
     def source(self) -> str:
         return self.visa_ask(':sour?')
@@ -2541,6 +1467,7 @@ class Waveform(Rigol1000zCommandMenu):
     def source(self, val: str):
         assert val in {*sources_analog, *sources_digital, *sources_math}
         self.visa_write(f':sour {val}')
+        self.read_settings["source"] = val
 
     @property
     def mode(self) -> str:
@@ -2550,6 +1477,7 @@ class Waveform(Rigol1000zCommandMenu):
     def mode(self, val: str):
         assert val in waveform_modes
         self.visa_write(f':mode {val}')
+        self.read_settings["mode"] = val
 
     @property
     def read_format(self) -> str:
@@ -2559,6 +1487,7 @@ class Waveform(Rigol1000zCommandMenu):
     def read_format(self, val: str):
         assert val in waveform_read_formats
         self.visa_write(f':form {val}')
+        self.read_settings["read_format"] = val
 
     @property
     def x_increment(self) -> float:
@@ -2687,6 +1616,7 @@ class Waveform(Rigol1000zCommandMenu):
         :return:
         """
         self.visa_write(f':star {val}')
+        self.read_settings["read_start_point"] = val
 
     @property
     def read_end_point(self):
@@ -2704,6 +1634,7 @@ class Waveform(Rigol1000zCommandMenu):
         :return:
         """
         self.visa_write(f':stop {val}')
+        self.read_settings["read_end_point"] = val
 
     @property
     def data_premable(self) -> PreambleContext:
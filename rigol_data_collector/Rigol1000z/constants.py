@@ -110,6 +110,89 @@ class EMeasureItem:
     EdgesNegative = "NEDG"
 
 
+class MeasureItemInfo:
+    """
+    What the scope needs for one measurement item and what it returns
+    """
+
+    def __init__(self, name: str, sources: int, digital: bool, unit: str, result_type: type = float):
+        self.name = name
+        """
+        Name of the item's get_<name> and set_<name> methods
+        """
+
+        self.sources = sources
+        """
+        Number of sources the item measures (1, or 2 for delays and phases)
+        """
+
+        self.digital = digital
+        """
+        Whether digital channels can be measured (on models that have them)
+        """
+
+        self.unit = unit
+        """
+        Unit of the result; "" for ratios and counts
+        """
+
+        self.result_type = result_type
+        """
+        Type of the result (float, or int for counts)
+        """
+
+
+measure_item_info = {
+    EMeasureItem.VoltageMax: MeasureItemInfo("voltage_max", 1, False, "V"),
+    EMeasureItem.VoltageMin: MeasureItemInfo("voltage_min", 1, False, "V"),
+    EMeasureItem.VoltagePeakToPeak: MeasureItemInfo("voltage_peak_to_peak", 1, False, "V"),
+    EMeasureItem.VoltageTop: MeasureItemInfo("voltage_top", 1, False, "V"),
+    EMeasureItem.VoltageBase: MeasureItemInfo("voltage_base", 1, False, "V"),
+    EMeasureItem.VoltageAmplitude: MeasureItemInfo("voltage_amp", 1, False, "V"),
+    EMeasureItem.VoltageUpper: MeasureItemInfo("voltage_upper", 1, False, "V"),
+    EMeasureItem.VoltageMid: MeasureItemInfo("voltage_mid", 1, False, "V"),
+    EMeasureItem.VoltageLower: MeasureItemInfo("voltage_lower", 1, False, "V"),
+    EMeasureItem.VoltageAverage: MeasureItemInfo("voltage_average", 1, False, "V"),
+    EMeasureItem.VoltageRMS: MeasureItemInfo("voltage_rms", 1, False, "V"),
+    EMeasureItem.VRmsPeriod: MeasureItemInfo("voltage_rms_period", 1, False, "V"),
+    EMeasureItem.VoltageOvershoot: MeasureItemInfo("voltage_overshoot", 1, False, ""),
+    EMeasureItem.VoltagePreshoot: MeasureItemInfo("preshoot", 1, False, ""),
+    EMeasureItem.Area: MeasureItemInfo("area", 1, False, "Vs"),
+    EMeasureItem.AreaPeriod: MeasureItemInfo("period_area", 1, False, "Vs"),
+    EMeasureItem.Period: MeasureItemInfo("period", 1, True, "s"),
+    EMeasureItem.Frequency: MeasureItemInfo("frequency", 1, True, "Hz"),
+    EMeasureItem.RiseTime: MeasureItemInfo("rise_time", 1, False, "s"),
+    EMeasureItem.FallTime: MeasureItemInfo("fall_time", 1, False, "s"),
+    EMeasureItem.WidthPositive: MeasureItemInfo("width_positive", 1, True, "s"),
+    EMeasureItem.WidthNegative: MeasureItemInfo("width_negative", 1, True, "s"),
+    EMeasureItem.DutyPositive: MeasureItemInfo("duty_positive", 1, True, ""),
+    EMeasureItem.DutyNegative: MeasureItemInfo("duty_negative", 1, True, ""),
+    EMeasureItem.DelayRise: MeasureItemInfo("rise_delay", 2, True, "s"),
+    EMeasureItem.DelayFall: MeasureItemInfo("fall_delay", 2, True, "s"),
+    EMeasureItem.PhaseRise: MeasureItemInfo("rise_phase", 2, True, "°"),
+    EMeasureItem.PhaseFall: MeasureItemInfo("fall_phase", 2, True, "°"),
+    EMeasureItem.TVMax: MeasureItemInfo("time_voltage_max", 1, False, "s"),
+    EMeasureItem.TVMin: MeasureItemInfo("time_voltage_min", 1, False, "s"),
+    EMeasureItem.SlewRatePositive: MeasureItemInfo("slew_rate_positive", 1, False, "V/s"),
+    EMeasureItem.SlewRateNegative: MeasureItemInfo("slew_rate_negative", 1, False, "V/s"),
+    EMeasureItem.Variance: MeasureItemInfo("variance", 1, False, "V²"),
+    EMeasureItem.PulsesPositive: MeasureItemInfo("pulses_positive", 1, False, "", int),
+    EMeasureItem.PulsesNegative: MeasureItemInfo("pulses_negative", 1, False, "", int),
+    EMeasureItem.EdgesPositive: MeasureItemInfo("edges_positive", 1, False, "", int),
+    EMeasureItem.EdgesNegative: MeasureItemInfo("edges_negative", 1, False, "", int),
+}
+"""
+The measurement items, in the order of EMeasureItem
+"""
+
+measure_items_single_source = tuple(item for item, info in measure_item_info.items() if info.sources == 1)
+
+measure_items_double_source = {item for item, info in measure_item_info.items() if info.sources == 2}
+
+# single source items that can measure a digital channel
+measure_items_digital = {item for item in measure_items_single_source if measure_item_info[item].digital}
+
+
 class EMeasurementStatisticItemType:
     Maximum = "MAX"
     Minimum = "MIN"
@@ -118,6 +201,14 @@ class EMeasurementStatisticItemType:
     Deviation = "DEV"
 
 
+class ETriggerStatus:
+    Triggered = "TD"
+    Waiting = "WAIT"
+    Run = "RUN"
+    Auto = "AUTO"
+    Stop = "STOP"
+
+
 class ETimebaseMode:
     Main = 'main'
     XY = 'xy'
@@ -195,3 +286,14 @@ class EWaveformReadFormat:
 
 
 waveform_read_formats = {EWaveformReadFormat.Word, EWaveformReadFormat.Byte, EWaveformReadFormat.Ascii}
+
+
+class EImageFormat:
+    Jpeg = "jpeg"
+    Png = "png"
+    Bmp8 = "bmp8"
+    Bmp24 = "bmp24"
+    Tiff = "tiff"
+
+
+image_formats = {EImageFormat.Jpeg, EImageFormat.Png, EImageFormat.Bmp8, EImageFormat.Bmp24, EImageFormat.Tiff}
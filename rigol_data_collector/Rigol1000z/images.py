@@ -0,0 +1,76 @@
+"""
+This module contains helpers for converting screenshots between image formats on the host.
+"""
+
+import io
+import os
+from .constants import EImageFormat, image_formats
+
+IMAGE_FORMAT_BY_EXTENSION = {
+    ".jpg": EImageFormat.Jpeg,
+    ".jpeg": EImageFormat.Jpeg,
+    ".png": EImageFormat.Png,
+    ".bmp": EImageFormat.Bmp24,
+    ".tif": EImageFormat.Tiff,
+    ".tiff": EImageFormat.Tiff,
+}
+"""
+The image format saved for each file extension
+"""
+
+_PILLOW_FORMATS = {
+    EImageFormat.Jpeg: ("JPEG", "RGB"),
+    EImageFormat.Png: ("PNG", None),
+    EImageFormat.Bmp8: ("BMP", "P"),
+    EImageFormat.Bmp24: ("BMP", "RGB"),
+    EImageFormat.Tiff: ("TIFF", None),
+}
+
+
+def image_format_for_filename(filename: str) -> str:
+    """
+    The image format to save a file in, from its extension.
+
+    :param filename: The file name.  The extension may also be a format name, e.g. "shot.bmp8".
+    :return: One of EImageFormat
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension[1:] in image_formats:
+        return extension[1:]
+    try:
+        return IMAGE_FORMAT_BY_EXTENSION[extension]
+    except KeyError:
+        raise ValueError(f"Unknown image extension: {filename}") from None
+
+
+def can_transcode() -> bool:
+    """
+    Whether Pillow is installed, so that transcode_image works.
+    """
+    try:
+        import PIL.Image
+    except ImportError:
+        return False
+    return True
+
+
+def transcode_image(data: bytes, img_format: str) -> bytes:
+    """
+    Convert an image to another format.  Needs Pillow.
+
+    :param data: The image, in any format Pillow can read.
+    :param img_format: The format to convert to, one of EImageFormat.
+    :return: The converted image
+    """
+    from PIL import Image
+
+    pillow_format, mode = _PILLOW_FORMATS[img_format]
+    image = Image.open(io.BytesIO(data))
+    if mode == "P" and image.mode != "P":
+        # the screen uses far fewer than 256 colors, so this doesn't lose anything
+        image = image.convert("RGB").quantize(256)
+    elif mode is not None and image.mode != mode:
+        image = image.convert(mode)
+    out = io.BytesIO()
+    image.save(out, pillow_format)
+    return out.getvalue()
@@ -0,0 +1,308 @@
+"""
+This module contains host-side versions of the scope's automatic measurements (EMeasureItem).
+
+The scope only measures the points on the screen, five items at a time. These functions
+measure whole RAW captures (up to 24 Mpts) instead. They work on the uint8 samples in chunks,
+so a memory-mapped capture (see rigolraw.load_capture) is never converted to voltages or
+read into memory at once:
+
+    1. A histogram of the sample codes gives the levels (Vmax, Vmin, Vtop, Vbase, ...),
+       the average, RMS, variance and area exactly.
+    2. Edges are found between the lower (10 %) and upper (90 %) levels with hysteresis,
+       so noise on a level isn't counted as edges. Crossing times are interpolated
+       between samples.
+
+Unlike the scope, the results of time measurements (period, widths, rise time, ...) are the
+averages over every complete edge or cycle in the capture. Overshoot, preshoot and duty
+cycles are ratios, phases are in degrees.
+"""
+
+import numpy as _np
+from typing import Dict, Iterable, Tuple
+from .capture import Capture
+from .commands import PreambleContext
+from .constants import EMeasureItem, measure_items_single_source
+
+DEFAULT_CHUNK_POINTS = 1 << 20
+"""
+Number of samples processed at once
+"""
+
+LOWER_LEVEL = 0.1
+MID_LEVEL = 0.5
+UPPER_LEVEL = 0.9
+"""
+Threshold levels, as fractions of the amplitude above Vbase (the scope's defaults,
+see MeasureSetup)
+"""
+
+_MIN_MODE_FRACTION = 0.05
+"""
+Vtop and Vbase are the most common levels above and below the middle, unless that level
+holds less than this fraction of the samples (e.g. a triangle wave); then they are Vmax and Vmin
+"""
+
+
+class _Edges:
+    """
+    The edges of one channel, as interpolated times in samples from the start of the capture.
+    """
+
+    def __init__(self):
+        self.rising = []  # arrays of (lower, mid, upper) crossing times
+        self.falling = []  # arrays of (upper, mid, lower) crossing times
+
+    def finish(self):
+        self.rising = _np.concatenate(self.rising) if self.rising else _np.empty((0, 3))
+        self.falling = _np.concatenate(self.falling) if self.falling else _np.empty((0, 3))
+
+
+def _histogram(raw: _np.ndarray, chunk_points: int) -> _np.ndarray:
+    counts = _np.zeros(256, _np.int64)
+    for start in range(0, len(raw), chunk_points):
+        counts += _np.bincount(raw[start:start + chunk_points], minlength=256)
+    return counts
+
+
+def _levels(counts: _np.ndarray) -> Tuple[int, int, float, float]:
+    """
+    :return: The codes of the maximum, minimum, top and base
+    """
+    present = _np.flatnonzero(counts)
+    code_max, code_min = int(present[-1]), int(present[0])
+    middle = (code_max + code_min) / 2
+
+    upper = counts.copy()
+    upper[:int(_np.floor(middle)) + 1] = 0
+    lower = counts.copy()
+    lower[int(_np.ceil(middle)):] = 0
+    top, base = float(code_max), float(code_min)
+    if upper.any() and upper.max() >= _MIN_MODE_FRACTION * upper.sum():
+        top = float(_np.argmax(upper))
+    if lower.any() and lower.max() >= _MIN_MODE_FRACTION * lower.sum():
+        base = float(_np.argmax(lower))
+    return code_max, code_min, top, base
+
+
+def _crossing(raw: _np.ndarray, i: _np.ndarray, level: float) -> _np.ndarray:
+    """
+    Interpolated times where the signal crosses `level` between samples i and i + 1.
+    """
+    a = raw[i].astype(_np.float64)
+    b = raw[i + 1].astype(_np.float64)
+    return i + (level - a) / (b - a)
+
+
+def _find_edges(raw: _np.ndarray, lower: float, mid: float, upper: float, chunk_points: int) -> _Edges:
+    edges = _Edges()
+    # samples from the last sample outside the hysteresis band of the previous chunk, so edges
+    # that span chunks are found in the next one
+    tail_start = 0
+    for start in range(0, len(raw), chunk_points):
+        stop = min(start + chunk_points, len(raw))
+        data = raw[tail_start:stop]
+
+        is_below = data <= lower
+        is_above = data >= upper
+        decisive = _np.flatnonzero(is_below | is_above)
+        if len(decisive) == 0:
+            continue
+        state = is_above[decisive]
+        change = _np.flatnonzero(state[1:] != state[:-1]) + 1
+        # last sample on the old level and first sample on the new one
+        last_old = decisive[change - 1]
+        first_new = decisive[change]
+
+        rising = state[change]
+        above_mid = data >= mid
+        mid_rise = _np.flatnonzero(~above_mid[:-1] & above_mid[1:])
+        mid_fall = _np.flatnonzero(above_mid[:-1] & ~above_mid[1:])
+
+        r_old, r_new = last_old[rising], first_new[rising]
+        if len(r_old):
+            m = mid_rise[_np.searchsorted(mid_rise, r_old)]
+            edges.rising.append(tail_start + _np.column_stack((
+                _crossing(data, r_old, lower), _crossing(data, m, mid), _crossing(data, r_new - 1, upper),
+            )))
+        f_old, f_new = last_old[~rising], first_new[~rising]
+        if len(f_old):
+            m = mid_fall[_np.searchsorted(mid_fall, f_old)]
+            edges.falling.append(tail_start + _np.column_stack((
+                _crossing(data, f_old, upper), _crossing(data, m, mid), _crossing(data, f_new - 1, lower),
+            )))
+
+        tail_start += int(decisive[-1])
+    edges.finish()
+    return edges
+
+
+def _edges(raw: _np.ndarray, top: float, base: float, chunk_points: int) -> _Edges:
+    if top > base:
+        return _find_edges(raw, base + LOWER_LEVEL * (top - base), base + MID_LEVEL * (top - base),
+                           base + UPPER_LEVEL * (top - base), chunk_points)
+    # a flat signal has no edges
+    edges = _Edges()
+    edges.finish()
+    return edges
+
+
+def _mean(values: _np.ndarray) -> float:
+    return float(_np.mean(values)) if len(values) else _np.nan
+
+
+def measure(raw: _np.ndarray, preamble: PreambleContext, items: Iterable[str] = None,
+            chunk_points: int = DEFAULT_CHUNK_POINTS) -> Dict[str, float]:
+    """
+    Measure one channel.
+
+    :param raw: uint8 samples of the channel, e.g. a row of Capture.raw
+    :param preamble: The channel's waveform preamble
+    :param items: Single source items (EMeasureItem) to return.  Default is all of them.
+    :param chunk_points: Number of samples processed at once
+    :return: The result of each item, NaN where it can't be measured (e.g. the period of a
+        signal without two rising edges)
+    """
+    items = measure_items_single_source if items is None else tuple(items)
+    assert all(item in measure_items_single_source for item in items)
+    raw = _np.asarray(raw)
+    if len(raw) == 0:
+        return {item: _np.nan for item in items}
+    dt = preamble.x_increment
+
+    def volts(code):
+        return float(preamble.to_voltage(_np.float64(code)))
+
+    counts = _histogram(raw, chunk_points)
+    code_max, code_min, top, base = _levels(counts)
+    n = counts.sum()
+    codes = _np.arange(256)
+    voltage = preamble.to_voltage(codes)
+    mean = float(counts @ voltage / n)
+    amplitude = volts(top) - volts(base)
+
+    results = {
+        EMeasureItem.VoltageMax: volts(code_max),
+        EMeasureItem.VoltageMin: volts(code_min),
+        EMeasureItem.VoltagePeakToPeak: volts(code_max) - volts(code_min),
+        EMeasureItem.VoltageTop: volts(top),
+        EMeasureItem.VoltageBase: volts(base),
+        EMeasureItem.VoltageAmplitude: amplitude,
+        EMeasureItem.VoltageUpper: volts(base) + UPPER_LEVEL * amplitude,
+        EMeasureItem.VoltageMid: volts(base) + MID_LEVEL * amplitude,
+        EMeasureItem.VoltageLower: volts(base) + LOWER_LEVEL * amplitude,
+        EMeasureItem.VoltageAverage: mean,
+        EMeasureItem.VoltageRMS: float(_np.sqrt(counts @ voltage ** 2 / n)),
+        EMeasureItem.Variance: float(counts @ (voltage - mean) ** 2 / n),
+        EMeasureItem.Area: float(counts @ voltage) * dt,
+        EMeasureItem.VoltageOvershoot: (volts(code_max) - volts(top)) / amplitude if amplitude else _np.nan,
+        EMeasureItem.VoltagePreshoot: (volts(base) - volts(code_min)) / amplitude if amplitude else _np.nan,
+        EMeasureItem.TVMax: preamble.x_origin + _first_index(raw, code_max, chunk_points) * dt,
+        EMeasureItem.TVMin: preamble.x_origin + _first_index(raw, code_min, chunk_points) * dt,
+    }
+
+    edges = _edges(raw, top, base, chunk_points)
+    rise_mid, fall_mid = edges.rising[:, 1], edges.falling[:, 1]
+
+    periods = _np.diff(rise_mid) if len(rise_mid) >= 2 else _np.diff(fall_mid)
+    period = _mean(periods) * dt
+    # each rising edge to the next falling edge, and the other way around
+    next_fall = _np.searchsorted(fall_mid, rise_mid)
+    positive = fall_mid[next_fall[next_fall < len(fall_mid)]] - rise_mid[next_fall < len(fall_mid)]
+    next_rise = _np.searchsorted(rise_mid, fall_mid)
+    negative = rise_mid[next_rise[next_rise < len(rise_mid)]] - fall_mid[next_rise < len(rise_mid)]
+    rise_time = _mean(edges.rising[:, 2] - edges.rising[:, 0]) * dt
+    fall_time = _mean(edges.falling[:, 2] - edges.falling[:, 0]) * dt
+    swing = (UPPER_LEVEL - LOWER_LEVEL) * amplitude
+
+    results.update({
+        EMeasureItem.Period: period,
+        EMeasureItem.Frequency: 1 / period if period else _np.nan,
+        EMeasureItem.RiseTime: rise_time,
+        EMeasureItem.FallTime: fall_time,
+        EMeasureItem.WidthPositive: _mean(positive) * dt,
+        EMeasureItem.WidthNegative: _mean(negative) * dt,
+        EMeasureItem.DutyPositive: _mean(positive) * dt / period,
+        EMeasureItem.DutyNegative: _mean(negative) * dt / period,
+        EMeasureItem.SlewRatePositive: swing / rise_time if rise_time else _np.nan,
+        EMeasureItem.SlewRateNegative: -swing / fall_time if fall_time else _np.nan,
+        EMeasureItem.PulsesPositive: float(len(positive)),
+        EMeasureItem.PulsesNegative: float(len(negative)),
+        EMeasureItem.EdgesPositive: float(len(rise_mid)),
+        EMeasureItem.EdgesNegative: float(len(fall_mid)),
+    })
+
+    # over the first complete period
+    if len(rise_mid) >= 2:
+        cycle = preamble.to_voltage(raw[int(_np.ceil(rise_mid[0])):int(_np.ceil(rise_mid[1]))])
+        results[EMeasureItem.VRmsPeriod] = float(_np.sqrt(_np.mean(cycle ** 2)))
+        results[EMeasureItem.AreaPeriod] = float(cycle.sum()) * dt
+    else:
+        results[EMeasureItem.VRmsPeriod] = results[EMeasureItem.AreaPeriod] = _np.nan
+
+    return {item: results[item] for item in items}
+
+
+def _first_index(raw: _np.ndarray, code: int, chunk_points: int) -> int:
+    for start in range(0, len(raw), chunk_points):
+        hits = _np.flatnonzero(raw[start:start + chunk_points] == code)
+        if len(hits):
+            return start + int(hits[0])
+    return 0
+
+
+def measure_delays(raw_1: _np.ndarray, preamble_1: PreambleContext, raw_2: _np.ndarray,
+                   preamble_2: PreambleContext, chunk_points: int = DEFAULT_CHUNK_POINTS) -> Dict[str, float]:
+    """
+    Measure the delays and phases between two channels of the same capture: the time from the
+    first rising (falling) edge of the first channel to the first rising (falling) edge of the
+    second one after it, and that time as a phase of the first channel's period in degrees.
+    Both channels must come from the same capture, so they share a time base.
+
+    :return: The results of DelayRise, DelayFall, PhaseRise and PhaseFall
+    """
+    raw_1, raw_2 = _np.asarray(raw_1), _np.asarray(raw_2)
+    if len(raw_1) == 0 or len(raw_2) == 0:
+        return {item: _np.nan for item in (EMeasureItem.DelayRise, EMeasureItem.DelayFall,
+                                           EMeasureItem.PhaseRise, EMeasureItem.PhaseFall)}
+    dt = preamble_1.x_increment
+    edges_1, edges_2 = [
+        _edges(raw, *_levels(_histogram(raw, chunk_points))[2:], chunk_points)
+        for raw in (raw_1, raw_2)
+    ]
+
+    rise_1 = edges_1.rising[:, 1]
+    period = _mean(_np.diff(rise_1)) * dt if len(rise_1) >= 2 else _mean(_np.diff(edges_1.falling[:, 1])) * dt
+
+    def delay(mid_1, mid_2):
+        if len(mid_1) == 0:
+            return _np.nan
+        after = mid_2[mid_2 >= mid_1[0]]
+        return float((after[0] - mid_1[0]) * dt) if len(after) else _np.nan
+
+    rise_delay = delay(rise_1, edges_2.rising[:, 1])
+    fall_delay = delay(edges_1.falling[:, 1], edges_2.falling[:, 1])
+    return {
+        EMeasureItem.DelayRise: rise_delay,
+        EMeasureItem.DelayFall: fall_delay,
+        EMeasureItem.PhaseRise: float(rise_delay / period * 360),
+        EMeasureItem.PhaseFall: float(fall_delay / period * 360),
+    }
+
+
+def measure_capture(capture: Capture, items: Iterable[str] = None,
+                    chunk_points: int = DEFAULT_CHUNK_POINTS) -> Dict[Tuple[str, str], float]:
+    """
+    Measure every channel of a capture.
+
+    :param capture: The capture, e.g. from Rigol1000z.capture or rigolraw.load_capture
+    :param items: Single source items (EMeasureItem) to return.  Default is all of them.
+    :param chunk_points: Number of samples processed at once
+    :return: The result of each (item, source), with sources named like ESource (e.g. "CHAN1"),
+        so the results can be compared with Measure.snapshot
+    """
+    results = {}
+    for i, name in enumerate(capture.names):
+        source = "CHAN" + name.removeprefix("CH")
+        for item, val in measure(capture.raw[i], capture.preambles[i], items, chunk_points).items():
+            results[(item, source)] = val
+    return results
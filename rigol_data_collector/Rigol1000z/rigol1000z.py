@@ -4,9 +4,14 @@ This module contains the definition for the high-level Rigol1000z driver.
 
 import numpy as _np
 import pyvisa as _visa
-from time import sleep
+from time import sleep, perf_counter
+from datetime import datetime
 from .commands import *
-from typing import List
+from .capture import Capture, CaptureWriter, TransferProgress, TransferSummary
+from .writers import writer_for_filename
+from .images import can_transcode, image_format_for_filename, transcode_image
+from concurrent.futures import Executor
+from typing import Callable, List, Tuple
 
 
 class Rigol1000z(Rigol1000zCommandMenu):
@@ -152,64 +157,77 @@ class Rigol1000z(Rigol1000zCommandMenu):
         return [c.enabled() for c in self.channel_list]
 
     # todo: make this more closely knit with the library
-    def get_screenshot(self, filename=None):
+    def get_screenshot(self, filename=None, img_format: str = None, transfer_format: str = None,
+                       executor: Executor = None):
         """
         Downloads a screenshot from the oscilloscope.
 
-        Args:
-            filename (str): The name of the image file.  The appropriate
-                extension should be included (i.e. jpg, png, bmp or tif).
-        """
-        img_format = None
-        # The format image that should be downloaded.
-        # Options are 'jpeg, 'png', 'bmp8', 'bmp24' and 'tiff'.
-        # It appears that 'jpeg' takes <3sec to download
-        # other formats take <0.5sec.
-        # Default is 'png'.
-
-        try:
-            img_format = filename.split(".")[-1].lower()
-        except KeyError:
-            img_format = "png"
+        Only the image itself is read, so the time taken is the time the scope needs to
+        prepare it plus the transfer.  The scope is slow to encode JPEG (up to 3 s, other formats
+        take <0.5 s), so by default JPEG, 24-bit BMP and TIFF are downloaded as PNG (the
+        smallest of the fast formats) and converted on the host, if Pillow is installed.
 
-        assert img_format in ('jpeg', 'png', 'bmp8', 'bmp24', 'tiff')
-
-        sleep(0.5)  # Wait for display to update
-
-        # Due to the up to 3s delay, we are setting timeout to None for this operation only
-        old_timeout = self.visa_resource.timeout
-        self.visa_resource.timeout = None
-
-        # Collect the image data from the scope
-        raw_img = self.visa_ask_raw(f':disp:data? on,off,{img_format}', 3850780)[11:-4]
-
-        self.visa_resource.timeout = old_timeout
-
-        if filename:
-            try:
-                os.remove(filename)
-            except OSError:
-                pass
-            with open(filename, 'wb') as fs:
-                fs.write(raw_img)
-
-        return raw_img
+        Args:
+            filename (str): The name of the image file.  Default is `None`; the image is only
+                returned.
+            img_format (str): Format of the returned image and the file, one of EImageFormat.
+                Default is the format of the file's extension (jpg, png, bmp or tif, see
+                images.image_format_for_filename), or png.
+            transfer_format (str): Format downloaded from the scope, one of EImageFormat.
+                Default is chosen as described above.
+            executor (Executor): If given, converting and saving the image is submitted to it,
+                so the scope is free for the next command as soon as the download is done.
 
-    def get_data(self, mode=EWaveformMode.Normal, filename=None):
+        Returns:
+            bytes: The image, or a Future of the image if an executor is given.
         """
-        Download the captured voltage points from the oscilloscope.
+        if img_format is None:
+            img_format = image_format_for_filename(filename) if filename else EImageFormat.Png
+        assert img_format in image_formats
+        if transfer_format is None:
+            if img_format in (EImageFormat.Png, EImageFormat.Bmp8) or not can_transcode():
+                transfer_format = img_format
+            else:
+                transfer_format = EImageFormat.Png
+        assert transfer_format in image_formats
+
+        # preparing the image can take a few seconds (see above) before the scope answers
+        data = self.visa_ask_block(f':disp:data? on,off,{transfer_format}', timeout=10000)
+
+        def finish():
+            img = data if transfer_format == img_format else transcode_image(data, img_format)
+            if filename:
+                with open(filename, 'wb') as fs:
+                    fs.write(img)
+            return img
+
+        return finish() if executor is None else executor.submit(finish)
+
+    def capture(self, mode=EWaveformMode.Normal, writer: CaptureWriter = None,
+                progress: Callable[[TransferProgress], None] = None,
+                summary: Callable[[TransferSummary], None] = None, channels: List[int] = None) -> Capture:
+        """
+        Download the raw samples of every enabled channel.
+
+        The samples are downloaded in blocks; each block is read for every channel before
+        moving on to the next one, so a writer receives complete rows as they arrive.
 
         Args:
             mode (str): 'norm' if only the points on the screen should be
                 downloaded, and 'raw' if all the points the ADC has captured
                 should be downloaded.  Default is 'norm'.
-            filename (None, str): Filename the data should be saved to.  Default
-                is `None`; the data is not saved to a file.
+            writer (None, CaptureWriter): Receives each block as soon as it has been
+                downloaded.  Default is `None`; the data is only kept in memory.
+            progress (None, Callable): Called with a TransferProgress after each block of
+                each channel.  It may raise CaptureCancelled (or any other exception) to
+                stop the download before the next block; the writer is still closed.
+            summary (None, Callable): Called with a TransferSummary once the download has
+                completed.  The summary is also stored in `Capture.transfer`.
+            channels (None, list[int]): Numbers of the channels to download.  Default is
+                `None`; every enabled channel is downloaded.
 
         Returns:
-            2-tuple: A tuple of two lists.  The first list is the time values
-                and the second list is the voltage values.
-
+            Capture: The downloaded samples and the preamble of each channel.
         """
 
         # Stop scope to capture waveform state
@@ -222,60 +240,174 @@ class Rigol1000z(Rigol1000zCommandMenu):
         # Set transmission format
         self.waveform.read_format = EWaveformReadFormat.Byte
 
-        # Create data structures to populate
-        time_series = None
-        all_channel_data = []
+        # Snapshot the preamble of each channel before downloading any data
+        if channels is None:
+            channels = [ch for ch in self.channel_list if ch.enabled]
+        else:
+            channels = [self[c] for c in channels]
+        names = [f"CH{ch.channel}" for ch in channels]
+        preambles: List[PreambleContext] = []
+        for ch in channels:
+            self.waveform.source = ch.name
+            preambles.append(self.waveform.data_premable)
+
+        # All channels share the memory depth of the acquisition
+        points = preambles[0].points if preambles else 0
+        metadata = self.capture_metadata(channels, mode)
+
+        raw = writer.open(names, preambles, points, metadata) if writer is not None else None
+        if raw is None:
+            raw = _np.empty((len(channels), points), _np.uint8)
+
+        max_num_pts: int = 250000
+
+        # transfer statistics
+        blocks_total = len(channels) * -(-points // max_num_pts)
+        blocks = 0
+        bytes_transferred = 0
+        slowest_mb_per_s = float("inf")
+        started = perf_counter()
 
-        # Iterate over possible channels
-        for c in range(1, 5):
+        try:
+            for start in range(0, points, max_num_pts):
+                stop = min(start + max_num_pts, points)
+                for i, ch in enumerate(channels):
+                    self.waveform.source = ch.name
+                    self.waveform.read_start_point = start + 1
+                    self.waveform.read_end_point = stop
+                    if stop - start < max_num_pts:
+                        sleep(0.2)
+                    read_started = perf_counter()
+                    data = self.visa_ask_raw(':wav:data?', max_num_pts)
+                    read_seconds = perf_counter() - read_started
+                    # Last byte marks the end of the message.
+                    raw[i, start:stop] = _np.frombuffer(data[11:-1], 'B')
+
+                    blocks += 1
+                    bytes_transferred += len(data)
+                    mb_per_s = len(data) / read_seconds / 1e6 if read_seconds else float("inf")
+                    slowest_mb_per_s = min(slowest_mb_per_s, mb_per_s)
+                    if progress is not None:
+                        progress(TransferProgress(names[i], stop, points, bytes_transferred, mb_per_s,
+                                                  blocks / blocks_total))
+
+                if writer is not None:
+                    writer.write_block(start, raw[:, start:stop])
+        finally:
+            if writer is not None:
+                writer.close()
+
+        transfer = TransferSummary(len(channels), points, bytes_transferred, blocks, perf_counter() - started,
+                                   slowest_mb_per_s if blocks else 0.0)
+        if summary is not None:
+            summary(transfer)
+
+        return Capture(names, preambles, raw, metadata, transfer)
+
+    def capture_all(self, mode=EWaveformMode.Normal, writer: CaptureWriter = None,
+                    progress: Callable[[TransferProgress], None] = None,
+                    summary: Callable[[TransferSummary], None] = None,
+                    channels: List[int] = None) -> Tuple[Capture, bytes]:
+        """
+        Download the raw samples and a screenshot of the same acquisition.
 
-            # Capture the waveform if the channel is enabled
-            if self[c].enabled:
+        The scope is stopped once, before the preambles are read, and the screenshot is taken
+        after the download while it is still stopped, so it shows exactly the waveforms that
+        were downloaded.  The arguments are the same as for `capture`.
 
-                self.waveform.source = self[c].name
+        Returns:
+            tuple: The Capture and the PNG image data.
+        """
+        capture = self.capture(mode, writer, progress, summary, channels)
+        return capture, self.get_screenshot()
+
+    def get_screen_data(self) -> Capture:
+        """
+        Download the points shown on the screen for every enabled channel without stopping
+        the scope.  This is much quicker than `capture` and suited to polling.
 
-                # retrieve the data preable
-                info: PreambleContext = self.waveform.data_premable
+        Returns:
+            Capture: The screen points (1200 per channel) and the preamble of each channel.
+        """
+        self.waveform.mode = EWaveformMode.Normal
+        self.waveform.read_format = EWaveformReadFormat.Byte
 
-                # Generate the time series for the data
-                time_series = _np.arange(0, info.points * info.x_increment, info.x_increment)
+        channels = [ch for ch in self.channel_list if ch.enabled]
+        preambles: List[PreambleContext] = []
+        datas = []
+        for ch in channels:
+            self.waveform.source = ch.name
+            info = self.waveform.data_premable
+            self.waveform.read_start_point = 1
+            self.waveform.read_end_point = info.points
+            preambles.append(info)
+            datas.append(_np.frombuffer(self.visa_ask_raw(':wav:data?')[11:-1], 'B'))
+
+        raw = _np.array(datas, _np.uint8).reshape(len(channels), -1)
+        return Capture([f"CH{ch.channel}" for ch in channels], preambles, raw)
+
+    def capture_metadata(self, channels: List[Channel], mode: str) -> dict:
+        """
+        Describe the scope and the settings of the captured channels.
 
-                max_num_pts: int = 250000
-                num_blocks: int = info.points // max_num_pts
-                last_block_pts: int = info.points % max_num_pts
+        Args:
+            channels (list[Channel]): The channels being captured.
+            mode (str): The waveform mode of the capture.
 
-                datas = []
-                # print(f"Data being gathered for Ch{}")
-                for i in range(num_blocks + 1):
-                    if i < num_blocks:
-                        self.waveform.read_start_point = 1 + i * 250000
-                        self.waveform.read_end_point = 250000 * (i + 1)
-                    else:
-                        if last_block_pts:
-                            self.waveform.read_start_point = 1 + num_blocks * 250000
-                            self.waveform.read_end_point = num_blocks * 250000 + last_block_pts
-                            sleep(0.2)
-                        else:
-                            break
-                    data = self.visa_ask_raw(':wav:data?', 250000)
+        Returns:
+            dict: JSON-serializable information stored alongside saved captures.
+        """
+        brand, model, serial_number, software_version, *add_args = self._idn_cache.strip().split(",")
+        return {
+            "idn": self._idn_cache.strip(),
+            "model": model,
+            "serial": serial_number,
+            "time": datetime.now().astimezone().isoformat(),
+            "mode": mode,
+            "channels": {
+                f"CH{ch.channel}": {
+                    "scale": ch.scale_v,
+                    "offset": ch.offset_v,
+                    "probe_ratio": ch.probe_ratio,
+                    "coupling": ch.coupling.strip(),
+                    "units": ch.units.strip(),
+                }
+                for ch in channels
+            },
+        }
 
-                    data = _np.frombuffer(data[11:-1], 'B')  # Last byte marks the end of the message.
-                    datas.append(data)
+    def get_data(self, mode=EWaveformMode.Normal, filename=None, writer: CaptureWriter = None,
+                 progress: Callable[[TransferProgress], None] = None,
+                 summary: Callable[[TransferSummary], None] = None):
+        """
+        Download the captured voltage points from the oscilloscope.
 
-                # Attach each data packet received into a complete data series
-                datas = _np.concatenate(datas)
+        Args:
+            mode (str): 'norm' if only the points on the screen should be
+                downloaded, and 'raw' if all the points the ADC has captured
+                should be downloaded.  Default is 'norm'.
+            filename (None, str): Filename the data should be saved to.  Default
+                is `None`; the data is not saved to a file.  The format is chosen
+                from the extension (see writers.writer_for_filename).
+            writer (None, CaptureWriter): Writer to stream the data to instead of
+                choosing one from `filename`.
+            progress (None, Callable): Called with a TransferProgress after each block
+                of each channel (see `capture`).
+            summary (None, Callable): Called with a TransferSummary once the download
+                has completed.
 
-                # Add the data series to the list of data series
-                all_channel_data.append(
-                    (datas - info.y_origin - info.y_reference) * info.y_increment
-                )
+        Returns:
+            2-tuple: A tuple of two lists.  The first list is the time values
+                and the second list is the voltage values.
 
+        The returned voltages are always held in memory.  Use `capture` with a
+        RigolRawWriter to download large captures straight into a memory-mapped file.
+        """
+        if filename and writer is None:
+            writer = writer_for_filename(filename)
         if filename:
             print(f"writing to: {filename}")
-            try:
-                os.remove(filename)
-            except OSError:
-                pass
-            _np.savetxt(filename, _np.column_stack((time_series, *all_channel_data)), '%.12e', ',', '\n', header='Time,CH1,CH2,CH3,CH4', comments='')
 
-        return time_series, all_channel_data
+        capture = self.capture(mode, writer, progress, summary)
+
+        return capture.time_series, capture.voltages()
@@ -2,7 +2,9 @@
 This module contains menu hierarchy abstractions.
 """
 
+import weakref
 import pyvisa as _visa
+from typing import List
 from .constants import *
 
 
@@ -36,12 +38,64 @@ class CommandMenu:
         self.visa_write(self.cmd_hierarchy_str + cmd)
         return self.visa_read_raw(num_bytes)
 
+    def visa_ask_block(self, cmd: str, timeout: int = None) -> bytes:
+        """
+        Query a command that answers with a definite length block (e.g. "#9000012345<data>\n")
+        and read exactly the data, instead of reading into a buffer of the largest possible size.
+
+        :param cmd: The query
+        :param timeout: Timeout in milliseconds for the start of the answer, for queries the
+            scope takes a while to prepare.  The data is read with the resource's timeout.
+            Default is `None` (the resource's timeout).
+        :return: The data of the block
+        """
+        self.visa_write(cmd)
+        old_timeout = self.visa_resource.timeout
+        if timeout is not None:
+            self.visa_resource.timeout = timeout
+        try:
+            header = self.visa_resource.read_bytes(2)
+        finally:
+            self.visa_resource.timeout = old_timeout
+
+        if header[:1] != b"#" or header[1:2] not in b"123456789":
+            raise ValueError(f"Expected a definite length block, got {header!r}")
+        length = int(self.visa_resource.read_bytes(int(header[1:2])))
+        data = self.visa_resource.read_bytes(length)
+        self.visa_read_raw()  # the newline after the block
+        return data
+
+    def visa_ask_many(self, cmds: List[str], batch_size: int = 8) -> List[str]:
+        """
+        Send many queries in few messages.  The queries are joined with ";" into messages of
+        `batch_size` queries, which the scope answers with one line of ";" separated results.
+
+        :param cmds: Complete queries, including their menu hierarchy (e.g. ":meas:item? VMAX,CHAN1")
+        :param batch_size: Number of queries per message.  Use 1 if the firmware doesn't accept
+            compound queries.
+        :return: The answer to each query
+        """
+        assert batch_size >= 1
+        answers = []
+        for i in range(0, len(cmds), batch_size):
+            batch = cmds[i:i + batch_size]
+            answer = self.visa_resource.query(";".join(batch)).strip().split(";")
+            if len(answer) != len(batch):
+                raise ValueError(f"Expected {len(batch)} results, got {len(answer)}; try a smaller batch_size")
+            answers += answer
+        return answers
+
 
 class Rigol1000zCommandMenu(CommandMenu):
     """
     Adds additional checks and features exclusive to the Rigol1000z series of scopes
     """
 
+    _idn_by_resource = weakref.WeakKeyDictionary()
+    """
+    The identifier of each open resource, so all the menus of a scope share one *IDN? query
+    """
+
     def __init__(self, visa_resource, idn: str = None):
         super().__init__(visa_resource)
 
@@ -50,7 +104,10 @@ class Rigol1000zCommandMenu(CommandMenu):
 
         else:
             # Cache the device's identifier
-            self._idn_cache: str = self.visa_resource.query("*IDN?")
+            self._idn_cache: str = self._idn_by_resource.get(visa_resource)
+            if self._idn_cache is None:
+                self._idn_cache = self.visa_resource.query("*IDN?")
+                self._idn_by_resource[visa_resource] = self._idn_cache
 
     @property
     def osc_model(self) -> str:
@@ -0,0 +1,179 @@
+"""
+This module contains the reader and writer for .rigolraw capture files.
+
+A .rigolraw file stores the raw BYTE samples of a capture at one byte per point:
+
+    magic           8 bytes, b"RIGOLRAW"
+    header length   uint32, little endian
+    header          utf-8 JSON (names and preambles of the captured channels, the capture
+                    metadata and the compression), padded with spaces so the samples start
+                    on a 64 byte boundary
+    samples         uncompressed: uint8 planes, one per channel, each `points` long
+                    compressed: for each downloaded block, for each channel, a uint32
+                    little endian length followed by the compressed samples
+"""
+
+import json
+import lzma
+import struct
+import zlib
+import numpy as _np
+from .capture import Capture, CaptureWriter
+from .commands import PreambleContext
+
+MAGIC = b"RIGOLRAW"
+VERSION = 1
+_ALIGNMENT = 64
+_PREFIX = struct.Struct("<8sI")
+_BLOCK_LENGTH = struct.Struct("<I")
+
+_COMPRESSORS = {
+    "zlib": (lambda data, level: zlib.compress(data, level), zlib.decompress),
+    "lzma": (lambda data, level: lzma.compress(data, preset=level), lzma.decompress),
+}
+
+
+class RigolRawWriter(CaptureWriter):
+    """
+    Writes a capture to a .rigolraw file.
+
+    Without compression, the file is created at its final size as soon as the preambles are
+    known and the sample planes are memory-mapped, so each downloaded block is stored directly
+    in its slice of the file rather than in process memory. The Capture returned by
+    Rigol1000z.capture keeps using the mapping.
+
+    With compression, each block of each channel is compressed and appended as it arrives.
+    """
+
+    def __init__(self, filename: str, compression: str = None, level: int = 1):
+        """
+        :param filename: Path of the .rigolraw file to write
+        :param compression: None, "zlib" or "lzma"
+        :param level: Compression level (zlib level or lzma preset)
+        """
+        assert compression is None or compression in _COMPRESSORS
+        self.filename = filename
+        self.compression = compression
+        self.level = level
+        self._raw = None
+        self._file = None
+
+    def open(self, names, preambles, points, metadata=None):
+        header = {
+            "version": VERSION,
+            "names": names,
+            "preambles": [pre.preamble_str for pre in preambles],
+            "points": points,
+            "metadata": metadata or {},
+            "compression": self.compression,
+        }
+
+        if self.compression is not None:
+            _write_header(self.filename, header, 0)
+            self._file = open(self.filename, "ab")
+            return None
+
+        offset = _write_header(self.filename, header, len(names) * points)
+        if not names or not points:
+            return None
+        self._raw = _np.memmap(self.filename, _np.uint8, "r+", offset, (len(names), points))
+        return self._raw
+
+    def write_block(self, start, block):
+        if self._file is None:
+            return
+        compress, _ = _COMPRESSORS[self.compression]
+        for data in block:
+            compressed = compress(_np.ascontiguousarray(data).tobytes(), self.level)
+            self._file.write(_BLOCK_LENGTH.pack(len(compressed)))
+            self._file.write(compressed)
+
+    def close(self):
+        if self._raw is not None:
+            self._raw.flush()
+            self._raw = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _write_header(filename: str, header: dict, data_size: int) -> int:
+    """
+    Create the file, write the prefix and header, and extend the file to hold the samples.
+
+    :return: Offset of the samples in the file
+    """
+    encoded = json.dumps(header).encode()
+    offset = -(-(_PREFIX.size + len(encoded)) // _ALIGNMENT) * _ALIGNMENT
+    encoded = encoded.ljust(offset - _PREFIX.size)
+    with open(filename, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, len(encoded)))
+        f.write(encoded)
+        f.truncate(offset + data_size)
+    return offset
+
+
+def read_header(filename: str):
+    """
+    Read the header of a .rigolraw file.
+
+    :param filename: Path of the .rigolraw file
+    :return: Tuple of the header dict and the offset of the samples in the file
+    :raises ValueError: If the file isn't a .rigolraw file
+    """
+    with open(filename, "rb") as f:
+        magic, length = _PREFIX.unpack(f.read(_PREFIX.size))
+        if magic != MAGIC:
+            raise ValueError(f"{filename} is not a .rigolraw file")
+        header = json.loads(f.read(length))
+    return header, _PREFIX.size + length
+
+
+def load_capture(filename: str) -> Capture:
+    """
+    Open a .rigolraw file.
+
+    Uncompressed samples are memory-mapped read-only, so opening a capture is instant
+    regardless of its size and only the parts that are used are read from disk.
+    Compressed samples are decompressed into memory.
+
+    :param filename: Path of the .rigolraw file
+    :return: The capture stored in the file
+    """
+    header, offset = read_header(filename)
+    names = header["names"]
+    points = header["points"]
+    preambles = [PreambleContext(pre) for pre in header["preambles"]]
+    metadata = header.get("metadata", {})
+    compression = header.get("compression")
+
+    if not names or not points:
+        raw = _np.empty((len(names), points), _np.uint8)
+    elif compression is None:
+        raw = _np.memmap(filename, _np.uint8, "r", offset, (len(names), points))
+    else:
+        raw = _read_compressed(filename, offset, len(names), points, compression)
+    return Capture(names, preambles, raw, metadata)
+
+
+def _read_compressed(filename: str, offset: int, channels: int, points: int, compression: str) -> _np.ndarray:
+    _, decompress = _COMPRESSORS[compression]
+    raw = _np.empty((channels, points), _np.uint8)
+    with open(filename, "rb") as f:
+        f.seek(offset)
+        start = 0
+        while start < points:
+            for i in range(channels):
+                prefix = f.read(_BLOCK_LENGTH.size)
+                if len(prefix) != _BLOCK_LENGTH.size:
+                    raise ValueError(f"{filename} is truncated")
+                length, = _BLOCK_LENGTH.unpack(prefix)
+                payload = f.read(length)
+                if len(payload) != length:
+                    raise ValueError(f"{filename} is truncated")
+                block = _np.frombuffer(decompress(payload), _np.uint8)
+                if not len(block):
+                    raise ValueError(f"{filename} is truncated")
+                raw[i, start:start + len(block)] = block
+            start += len(block)
+    return raw
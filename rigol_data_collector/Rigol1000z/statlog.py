@@ -0,0 +1,245 @@
+"""
+This module contains a logger that polls measurement statistics at a fixed rate.
+
+A statistics log is append-only:
+
+    magic           8 bytes, b"RIGOLSTA"
+    header length   uint32, little endian
+    header          utf-8 JSON (the names of the columns, the target rate and when the log
+                    was created)
+    rows            float64, little endian: the time of the sample (seconds since the epoch)
+                    followed by one value per column; NaN where the scope had no result
+"""
+
+import json
+import os
+import struct
+import threading
+from datetime import datetime
+from time import monotonic, time
+from typing import Iterable, List, Tuple
+import numpy as _np
+from .commands import Measure
+from .constants import EMeasurementStatisticItemType
+from .rigol1000z import Rigol1000z
+
+MAGIC = b"RIGOLSTA"
+VERSION = 1
+_PREFIX = struct.Struct("<8sI")
+
+COUNTER_COLUMN = "counter"
+
+
+class StatisticLogger:
+    """
+    Polls measurement statistics (and optionally the frequency counter) on a background
+    thread.  Each sample is stored in a fixed-size ring buffer, which a second thread
+    appends to the log file every `flush_interval` seconds, so a slow disk doesn't delay the
+    next sample.
+
+    Samples are taken on the original schedule; if one takes longer than the interval, the
+    slots that were missed are skipped and counted in `missed`.  Samples that were
+    overwritten in the ring buffer before they could be written are counted in `dropped`.
+    """
+
+    def __init__(self, osc: Rigol1000z, items: Iterable[Tuple[str, str, str]], filename: str,
+                 rate: float = 10.0, counter: bool = False, capacity: int = 4096,
+                 flush_interval: float = 1.0, lock=None, batch_size: int = 8):
+        """
+        :param osc: The scope.  The statistic function must be enabled for the items
+            (see MeasurementStatistic and MeasurementStatisticItem).
+        :param items: (statistic type, item, source) of each value to log, e.g.
+            (EMeasurementStatisticItemType.Current, EMeasureItem.Frequency, ESource.Ch1)
+        :param filename: Path of the log.  An existing log with the same columns is appended to.
+        :param rate: Target number of samples per second
+        :param counter: Also log the frequency counter (MeasureCounter.value)
+        :param capacity: Number of samples the ring buffer holds
+        :param flush_interval: Time between writes to the log in seconds
+        :param lock: Held while polling, if the scope is shared with other threads
+        :param batch_size: Number of queries per message (see CommandMenu.visa_ask_many)
+        """
+        items = list(items)
+        for stat_type, item, source in items:
+            assert stat_type in {
+                EMeasurementStatisticItemType.Maximum, EMeasurementStatisticItemType.Minimum,
+                EMeasurementStatisticItemType.Current, EMeasurementStatisticItemType.Average,
+                EMeasurementStatisticItemType.Deviation
+            }
+        assert items or counter
+        assert capacity >= rate * flush_interval * 2, "the ring buffer must hold two flush intervals"
+
+        self.osc = osc
+        self.filename = filename
+        self.rate = rate
+        self.flush_interval = flush_interval
+        self.lock = lock
+        self.batch_size = batch_size
+        self.columns = [" ".join(key) for key in items] + ([COUNTER_COLUMN] if counter else [])
+        self._queries = [f":meas:stat:item? {stat_type},{item},{source}" for stat_type, item, source in items]
+        if counter:
+            self._queries.append(":meas:coun:val?")
+
+        self.samples = 0
+        self.missed = 0
+        self.dropped = 0
+        self.error = None
+        self._started = None
+        self._stopped = None
+
+        self._buffer = _np.full((capacity, 1 + len(self.columns)), _np.nan)
+        self._written = 0  # samples put in the buffer
+        self._flushed = 0  # samples taken out of the buffer
+        self._buffer_lock = threading.Lock()
+        self._file = _open_log(filename, self.columns, rate)
+
+        self._stop = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._run, name="statistic-logger", daemon=True),
+            threading.Thread(target=self._flush_loop, name="statistic-log-writer", daemon=True),
+        ]
+
+    def start(self) -> None:
+        self._started = monotonic()
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop polling and write the remaining samples to the log.
+        """
+        self._stop.set()
+        for thread in self._threads:
+            if thread.is_alive():
+                thread.join()
+        if not self._file.closed:
+            self._flush()
+            self._file.close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
+
+    @property
+    def achieved_rate(self) -> float:
+        """
+        Samples per second since the logger was started
+        """
+        if self._started is None:
+            return 0.0
+        elapsed = (self._stopped or monotonic()) - self._started
+        return self.samples / elapsed if elapsed > 0 else 0.0
+
+    def latest(self, count: int = None) -> _np.ndarray:
+        """
+        The last samples in the ring buffer, oldest first.
+
+        :param count: Number of samples.  Default is all of the ones in the buffer.
+        :return: One row per sample: the time, then one value per column
+        """
+        with self._buffer_lock:
+            start = max(0, self._written - len(self._buffer))
+            if count is not None:
+                start = max(start, self._written - count)
+            return self._buffer[_np.arange(start, self._written) % len(self._buffer)]
+
+    def _run(self) -> None:
+        interval = 1 / self.rate
+        next_time = self._started
+        try:
+            while not self._stop.wait(max(0.0, next_time - monotonic())):
+                if self.lock is not None:
+                    with self.lock:
+                        answers = self.osc.visa_ask_many(self._queries, self.batch_size)
+                else:
+                    answers = self.osc.visa_ask_many(self._queries, self.batch_size)
+                values = _np.array([float(val) for val in answers])
+                values[values >= Measure.invalid_result] = _np.nan
+
+                with self._buffer_lock:
+                    row = self._buffer[self._written % len(self._buffer)]
+                    row[0] = time()
+                    row[1:] = values
+                    self._written += 1
+                self.samples += 1
+
+                next_time += interval
+                behind = monotonic() - next_time
+                if behind > 0:
+                    skipped = int(behind // interval) + 1
+                    self.missed += skipped
+                    next_time += skipped * interval
+        except Exception as e:
+            self.error = e
+        finally:
+            self._stopped = monotonic()
+
+    def _flush_loop(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self._flush()
+
+    def _flush(self) -> None:
+        with self._buffer_lock:
+            start = max(self._flushed, self._written - len(self._buffer))
+            self.dropped += start - self._flushed
+            rows = self._buffer[_np.arange(start, self._written) % len(self._buffer)]
+            self._flushed = self._written
+        rows.astype("<f8").tofile(self._file)
+        self._file.flush()
+
+
+def _open_log(filename: str, columns: List[str], rate: float):
+    if os.path.exists(filename) and os.path.getsize(filename) > 0:
+        header, _ = read_header(filename)
+        if header["columns"] != columns:
+            raise ValueError(f"{filename} logs different columns: {header['columns']}")
+        f = open(filename, "ab")
+        # drop a row that was only partly written when the last run was killed
+        _, offset = read_header(filename)
+        row_size = 8 * (1 + len(columns))
+        f.truncate(offset + (os.path.getsize(filename) - offset) // row_size * row_size)
+        return f
+
+    header = json.dumps({
+        "version": VERSION,
+        "columns": columns,
+        "rate": rate,
+        "created": datetime.now().astimezone().isoformat(),
+    }).encode()
+    f = open(filename, "wb")
+    f.write(_PREFIX.pack(MAGIC, len(header)))
+    f.write(header)
+    f.flush()
+    return f
+
+
+def read_header(filename: str):
+    """
+    Read the header of a statistics log.
+
+    :param filename: Path of the log
+    :return: The header dict and the offset of the first row
+    """
+    with open(filename, "rb") as f:
+        magic, length = _PREFIX.unpack(f.read(_PREFIX.size))
+        if magic != MAGIC:
+            raise ValueError(f"{filename} is not a statistics log")
+        header = json.loads(f.read(length))
+    return header, _PREFIX.size + length
+
+
+def read_log(filename: str) -> Tuple[List[str], _np.ndarray]:
+    """
+    Read a statistics log.
+
+    :param filename: Path of the log
+    :return: The names of the columns, and one row per sample: the time (seconds since the
+        epoch), then one value per column
+    """
+    header, offset = read_header(filename)
+    width = 1 + len(header["columns"])
+    data = _np.fromfile(filename, "<f8", offset=offset)
+    return header["columns"], data[:len(data) // width * width].reshape(-1, width)
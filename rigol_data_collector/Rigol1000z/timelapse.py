@@ -0,0 +1,193 @@
+"""
+This module contains a screenshot time-lapse recorder that only stores frames that changed.
+
+A time-lapse directory contains:
+
+    frames/000001.png ...   each distinct screen once, numbered in the order they first appeared
+    index.csv               one row per screenshot taken: its time (ISO 8601) and the name of
+                            the frame that was on the screen, so runs of the same name are the
+                            intervals where nothing changed
+"""
+
+import csv
+import hashlib
+import os
+import threading
+from datetime import datetime
+from time import monotonic
+from typing import List, Tuple
+from .constants import EImageFormat
+from .rigol1000z import Rigol1000z
+
+INDEX_NAME = "index.csv"
+FRAMES_NAME = "frames"
+
+
+class TimeLapse:
+    """
+    Writes screenshots to a time-lapse directory.
+
+    Each frame is hashed (BLAKE2b of the image bytes as downloaded, which are identical for
+    identical screens); a frame that has been seen before is only added to the index.
+    """
+
+    def __init__(self, directory: str, img_format: str = EImageFormat.Png):
+        """
+        :param directory: The time-lapse directory.  An existing time-lapse is continued.
+        :param img_format: Format of the frames, one of EImageFormat
+        """
+        self.directory = directory
+        self.img_format = img_format
+        self.stored = 0
+        self.missed = 0
+        os.makedirs(os.path.join(directory, FRAMES_NAME), exist_ok=True)
+
+        self._frames = {}  # hash -> frame name
+        for frame in sorted(os.listdir(os.path.join(directory, FRAMES_NAME))):
+            with open(os.path.join(directory, FRAMES_NAME, frame), "rb") as f:
+                self._frames.setdefault(hashlib.blake2b(f.read()).hexdigest(), frame)
+        self.captures = len(read_index(directory))
+        self._index = open(os.path.join(directory, INDEX_NAME), "a", newline="")
+        self._csv = csv.writer(self._index)
+        if self.captures == 0:
+            self._csv.writerow(["time", "frame"])
+
+    def add(self, image: bytes, time: datetime = None) -> bool:
+        """
+        Add a screenshot to the time-lapse.
+
+        :param image: The screenshot, as returned by Rigol1000z.get_screenshot
+        :param time: When it was taken.  Default is now.
+        :return: True if it was a new frame and was stored, False if only the index was updated
+        """
+        time = time or datetime.now().astimezone()
+        digest = hashlib.blake2b(image).hexdigest()
+        frame = self._frames.get(digest)
+        new = frame is None
+        if new:
+            extension = "bmp" if self.img_format in (EImageFormat.Bmp8, EImageFormat.Bmp24) else self.img_format
+            frame = f"{len(self._frames) + 1:06d}.{extension}"
+            with open(os.path.join(self.directory, FRAMES_NAME, frame), "wb") as f:
+                f.write(image)
+            self._frames[digest] = frame
+            self.stored += 1
+        self._csv.writerow([time.isoformat(), frame])
+        # flushed each time, so the index is complete up to the last frame if the run is killed
+        self._index.flush()
+        self.captures += 1
+        return new
+
+    def record(self, osc: Rigol1000z, interval: float, count: int = None, duration: float = None,
+               stop: threading.Event = None, lock=None) -> None:
+        """
+        Take screenshots at a fixed rate until `count` screenshots have been taken,
+        `duration` has passed or `stop` is set, whichever is first.
+
+        Screenshots are taken on the original schedule; if one takes longer than the
+        interval, the slots that were missed are skipped and counted in `missed`.
+
+        :param osc: The scope
+        :param interval: Time between screenshots in seconds
+        :param count: Number of screenshots to take.  Default is `None` (no limit).
+        :param duration: Time to record for in seconds.  Default is `None` (no limit).
+        :param stop: Set to stop recording.  Default is `None`.
+        :param lock: Held while taking each screenshot, if the scope is shared with other
+            threads.  Default is `None`.
+        """
+        stop = stop or threading.Event()
+        started = next_time = monotonic()
+        taken = 0
+        while (count is None or taken < count) and (duration is None or next_time - started < duration):
+            if stop.wait(max(0.0, next_time - monotonic())):
+                return
+            if lock is not None:
+                with lock:
+                    image = osc.get_screenshot(img_format=self.img_format)
+            else:
+                image = osc.get_screenshot(img_format=self.img_format)
+            self.add(image)
+            taken += 1
+
+            next_time += interval
+            behind = monotonic() - next_time
+            if behind > 0:
+                skipped = int(behind // interval) + 1
+                self.missed += skipped
+                next_time += skipped * interval
+
+    def close(self) -> None:
+        self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+
+def read_index(directory: str) -> List[Tuple[datetime, str]]:
+    """
+    Read the index of a time-lapse directory.
+
+    :param directory: The time-lapse directory
+    :return: The time of each screenshot and the name of its frame, in order.  Empty if the
+        directory has no index yet.
+    """
+    try:
+        with open(os.path.join(directory, INDEX_NAME), newline="") as f:
+            rows = list(csv.reader(f))[1:]
+    except FileNotFoundError:
+        return []
+    return [(datetime.fromisoformat(time), frame) for time, frame in rows]
+
+
+def export_animation(directory: str, filename: str, speedup: float = 60.0, min_frame_ms: int = 20,
+                     scale: float = 1.0, max_frames: int = 2000) -> int:
+    """
+    Export a time-lapse as an animated GIF or WebP (from the extension), showing each screen
+    for as long as it was on the scope, sped up.  Needs Pillow.
+
+    Pillow holds every frame of the animation in memory until the file is written (about
+    1 MB per 800x480 frame for WebP, a third of that for GIF), so long time-lapses need a
+    smaller `scale` or a higher `max_frames`.
+
+    :param directory: The time-lapse directory
+    :param filename: The animation file
+    :param speedup: How many times faster than real time to play
+    :param min_frame_ms: Shortest time a frame is shown, in milliseconds
+    :param scale: Size of the animation relative to the screenshots
+    :param max_frames: Most frames the animation may have; more raise a ValueError
+    :return: Number of frames in the animation
+    """
+    from PIL import Image
+
+    index = read_index(directory)
+    if not index:
+        raise ValueError(f"{directory} has no screenshots")
+
+    # merge consecutive screenshots of the same frame into one frame of the animation
+    runs = []  # [frame, start time]
+    for time, frame in index:
+        if not runs or runs[-1][0] != frame:
+            runs.append([frame, time])
+    if len(runs) > max_frames:
+        raise ValueError(f"{directory} has {len(runs)} frames, more than max_frames ({max_frames})")
+    # the last screen is shown until the last screenshot, plus the median time between
+    # screenshots, as if one more had been taken
+    gaps = sorted((b - a).total_seconds() for (a, _), (b, _) in zip(index, index[1:]))
+    end = (index[-1][0] - runs[-1][1]).total_seconds() + (gaps[len(gaps) // 2] if gaps else 0.0)
+    seconds = [(b - a).total_seconds() for (_, a), (_, b) in zip(runs, runs[1:])] + [end]
+    durations = [max(min_frame_ms, round(s * 1000 / speedup)) for s in seconds]
+
+    def load(frame):
+        with Image.open(os.path.join(directory, FRAMES_NAME, frame)) as image:
+            image = image.convert("RGB")
+        if scale != 1.0:
+            image = image.resize((max(1, round(image.width * scale)), max(1, round(image.height * scale))))
+        return image
+
+    # each frame file is closed once it's decoded; the writer still keeps the decoded frames
+    load(runs[0][0]).save(filename, save_all=True, append_images=(load(frame) for frame, _ in runs[1:]),
+                          duration=durations, loop=0)
+    return len(runs)
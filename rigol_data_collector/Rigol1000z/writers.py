@@ -0,0 +1,299 @@
+"""
+This module contains CaptureWriter implementations for the file formats waveform data can be saved in.
+"""
+
+import json
+import numpy as _np
+from typing import List, Tuple
+from .capture import CaptureWriter
+from .commands import PreambleContext
+from .rigolraw import RigolRawWriter
+
+PREAMBLE_METADATA_PREFIX = "rigol.preamble."
+"""
+Prefix of the schema metadata keys holding each channel's preamble string in Parquet files
+"""
+
+
+class CsvWriter(CaptureWriter):
+    """
+    Writes a capture to a csv file with a Time column followed by one column per channel,
+    formatted like numpy.savetxt with '%.12e'.
+
+    Blocks are formatted in chunks without a Python loop over rows: channel values are
+    looked up from a table of the 256 possible strings per channel and assembled in a
+    reusable byte buffer, which is written to the file with a single call per chunk.
+    """
+
+    def __init__(self, filename: str, chunk_points: int = 65536):
+        """
+        :param filename: Path of the csv file to write
+        :param chunk_points: Number of rows formatted at once; bounds the size of the buffer
+        """
+        self.filename = filename
+        self.chunk_points = chunk_points
+        self._file = None
+        self._x_increment = 0.0
+        self._luts: List[_np.ndarray] = []
+        self._buffer = _np.empty(0, _np.uint8)
+
+    def open(self, names, preambles, points, metadata=None):
+        self._file = open(self.filename, "wb")
+        self._file.write((",".join(["Time", *names]) + "\n").encode())
+
+        self._x_increment = preambles[0].x_increment if preambles else 0.0
+        self._luts = [_byte_strings(b"%.12e" % v for v in pre.to_voltage(_np.arange(256, dtype=_np.uint8)))
+                      for pre in preambles]
+        return None
+
+    def write_block(self, start, block):
+        for offset in range(0, block.shape[1], self.chunk_points):
+            chunk = block[:, offset:offset + self.chunk_points]
+            first = start + offset
+            times = _np.arange(first, first + chunk.shape[1]) * self._x_increment
+            columns = [_byte_strings((("%.12e " * len(times)) % tuple(times)).encode().split())]
+            columns += [lut[data] for lut, data in zip(self._luts, chunk)]
+            self._file.write(self._format_rows(columns))
+
+    def _format_rows(self, columns: List[_np.ndarray]) -> _np.ndarray:
+        """
+        Join the columns into csv rows.
+
+        The columns are copied side by side into a reusable fixed-width row buffer, then the
+        zero padding is dropped, which leaves the rows joined back to back.
+
+        :param columns: uint8 arrays of shape (rows, width) holding zero-padded strings
+        :return: uint8 array of the formatted rows
+        """
+        rows = columns[0].shape[0]
+        # one separator (',' or '\n') follows every value
+        width = sum(col.shape[1] for col in columns) + len(columns)
+        if self._buffer.size < rows * width:
+            self._buffer = _np.empty(rows * width, _np.uint8)
+        out = self._buffer[:rows * width].reshape(rows, width)
+
+        pos = 0
+        for col in columns:
+            out[:, pos:pos + col.shape[1]] = col
+            pos += col.shape[1]
+            out[:, pos] = ord(",")
+            pos += 1
+        out[:, -1] = ord("\n")
+
+        out = out.reshape(-1)
+        return out[out != 0]
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _byte_strings(strings) -> _np.ndarray:
+    """
+    Pack byte strings into a zero-padded uint8 matrix with one row per string.
+
+    :param strings: Iterable of bytes
+    :return: uint8 array of shape (strings, longest string)
+    """
+    packed = _np.array(list(strings), dtype=_np.bytes_)
+    return packed.view(_np.uint8).reshape(len(packed), packed.itemsize)
+
+
+class ParquetWriter(CaptureWriter):
+    """
+    Writes a capture to an Apache Parquet file with one column per channel.
+
+    Every downloaded block becomes one row group, so the file is written while the capture
+    is still in progress. The preamble of each channel is stored in the schema metadata,
+    which is enough to rebuild the time axis and (for raw columns) the voltages.
+
+    Requires pyarrow.
+    """
+
+    def __init__(self, filename: str, dtype: str = "float32", compression: str = "snappy"):
+        """
+        :param filename: Path of the Parquet file to write
+        :param dtype: "float32" to store voltages or "uint8" to store the raw BYTE samples
+        :param compression: Parquet compression codec
+        """
+        assert dtype in ("float32", "uint8")
+        self.filename = filename
+        self.dtype = dtype
+        self.compression = compression
+        self._pa = None
+        self._writer = None
+        self._schema = None
+        self._preambles: List[PreambleContext] = []
+
+    def open(self, names, preambles, points, metadata=None):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._preambles = preambles
+        column_type = pa.float32() if self.dtype == "float32" else pa.uint8()
+        schema_metadata = {
+            f"{PREAMBLE_METADATA_PREFIX}{name}": pre.preamble_str for name, pre in zip(names, preambles)
+        }
+        schema_metadata["rigol.dtype"] = self.dtype
+        schema_metadata["rigol.metadata"] = json.dumps(metadata or {})
+        self._schema = pa.schema([pa.field(name, column_type) for name in names], metadata=schema_metadata)
+        self._writer = pq.ParquetWriter(self.filename, self._schema, compression=self.compression)
+        return None
+
+    def write_block(self, start, block):
+        if self.dtype == "float32":
+            columns = [pre.to_voltage(data, _np.float32) for pre, data in zip(self._preambles, block)]
+        else:
+            columns = list(block)
+        self._writer.write_table(self._pa.Table.from_arrays(columns, schema=self._schema))
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class NpyWriter(CaptureWriter):
+    """
+    Writes a capture to a .npy file holding a float64 array of shape (points, 1 + channels),
+    with the same Time, CH... column layout as the csv files.
+
+    The array is memory-mapped and filled one block at a time.
+    """
+
+    def __init__(self, filename: str):
+        """
+        :param filename: Path of the .npy file to write
+        """
+        self.filename = filename
+        self._array = None
+        self._preambles: List[PreambleContext] = []
+
+    def open(self, names, preambles, points, metadata=None):
+        self._preambles = preambles
+        self._array = _np.lib.format.open_memmap(self.filename, "w+", _np.float64, (points, 1 + len(names)))
+        return None
+
+    def write_block(self, start, block):
+        stop = start + block.shape[1]
+        self._array[start:stop, 0] = _np.arange(start, stop) * self._preambles[0].x_increment
+        for i, (pre, data) in enumerate(zip(self._preambles, block)):
+            self._array[start:stop, i + 1] = pre.to_voltage(data)
+
+    def close(self):
+        if self._array is not None:
+            self._array.flush()
+            self._array = None
+
+
+class Hdf5Writer(CaptureWriter):
+    """
+    Writes a capture to an HDF5 file with one float32 voltage dataset per channel.
+
+    Each dataset has the channel's preamble string and x_increment as attributes, and the
+    capture metadata is stored as a JSON attribute of the file.
+
+    Requires h5py.
+    """
+
+    def __init__(self, filename: str, compression: str = None):
+        """
+        :param filename: Path of the HDF5 file to write
+        :param compression: HDF5 dataset compression filter, e.g. "gzip" or "lzf"
+        """
+        self.filename = filename
+        self.compression = compression
+        self._file = None
+        self._datasets = []
+        self._preambles: List[PreambleContext] = []
+
+    def open(self, names, preambles, points, metadata=None):
+        import h5py
+
+        self._preambles = preambles
+        self._file = h5py.File(self.filename, "w")
+        self._file.attrs["metadata"] = json.dumps(metadata or {})
+        self._datasets = []
+        for name, pre in zip(names, preambles):
+            dataset = self._file.create_dataset(name, (points,), _np.float32, compression=self.compression)
+            dataset.attrs["preamble"] = pre.preamble_str
+            dataset.attrs["x_increment"] = pre.x_increment
+            self._datasets.append(dataset)
+        return None
+
+    def write_block(self, start, block):
+        stop = start + block.shape[1]
+        for dataset, pre, data in zip(self._datasets, self._preambles, block):
+            dataset[start:stop] = pre.to_voltage(data, _np.float32)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_parquet_info(filename: str) -> Tuple[List[str], List[PreambleContext], dict]:
+    """
+    Read the channels, preambles and capture metadata of a Parquet file written by ParquetWriter
+    without reading any samples.
+
+    :param filename: Path of the Parquet file
+    :return: Tuple of the column labels, the preamble of each column and the capture metadata
+    """
+    import pyarrow.parquet as pq
+
+    schema = pq.read_schema(filename)
+    metadata = schema.metadata or {}
+    names, preambles = [], []
+    for name in schema.names:
+        key = f"{PREAMBLE_METADATA_PREFIX}{name}".encode()
+        if key in metadata:
+            names.append(name)
+            preambles.append(PreambleContext(metadata[key].decode()))
+    return names, preambles, json.loads(metadata.get(b"rigol.metadata", b"{}"))
+
+
+def read_parquet_channel(filename: str, channel: int) -> Tuple[_np.ndarray, _np.ndarray]:
+    """
+    Read a single channel from a Parquet file written by ParquetWriter.
+
+    Only the requested column is read from disk.
+
+    :param filename: Path of the Parquet file
+    :param channel: Channel number (1-4)
+    :return: Tuple of the time series and the voltages of the channel
+    :raises KeyError: If the channel isn't in the file
+    """
+    import pyarrow.parquet as pq
+
+    name = f"CH{channel}"
+    names, preambles, _ = read_parquet_info(filename)
+    if name not in names:
+        raise KeyError(name)
+    preamble = preambles[names.index(name)]
+
+    data = pq.read_table(filename, columns=[name]).column(name).to_numpy()
+    if data.dtype == _np.uint8:
+        data = preamble.to_voltage(data)
+    return preamble.time_series(len(data)), data
+
+
+def writer_for_filename(filename: str) -> CaptureWriter:
+    """
+    Choose a writer based on the extension of a file name.
+
+    :param filename: Path of the file to write
+    :return: A writer for the file; csv unless another format matches the extension
+    """
+    extension = filename.lower()
+    if extension.endswith(".parquet"):
+        return ParquetWriter(filename)
+    if extension.endswith(".rigolraw"):
+        return RigolRawWriter(filename)
+    if extension.endswith(".npy"):
+        return NpyWriter(filename)
+    if extension.endswith((".h5", ".hdf5")):
+        return Hdf5Writer(filename)
+    return CsvWriter(filename)
@@ -0,0 +1,4 @@
+"""
+The GUI runs from this directory as scripts (see README); only util and rigol_capture are
+installed as part of this package, along with the Rigol1000z driver.
+"""
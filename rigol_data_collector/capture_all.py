@@ -0,0 +1,137 @@
+"""
+Saves the data, a screenshot and a metadata sidecar of one acquisition together.
+"""
+
+import json
+import os
+
+import numpy as np
+
+import util
+from Rigol1000z import Rigol1000z, Capture
+from Rigol1000z.rigolraw import load_capture
+from Rigol1000z.writers import writer_for_filename
+
+
+def sidecar_metadata(capture: Capture, data_path: str, image_path: str) -> dict:
+    """
+    Describes a capture and the files it was saved to.
+
+    Args:
+        capture (Capture): The downloaded capture.
+        data_path (str): Path of the data file.
+        image_path (str): Path of the screenshot.
+
+    Returns:
+        dict: JSON-serializable contents of the sidecar file.
+    """
+    transfer = capture.transfer
+    return {
+        "data": os.path.basename(data_path),
+        "screenshot": os.path.basename(image_path),
+        "names": capture.names,
+        "points": capture.points,
+        "preambles": {name: pre.preamble_str for name, pre in zip(capture.names, capture.preambles)},
+        "metadata": capture.metadata,
+        "transfer": None
+        if transfer is None
+        else {
+            "bytes": transfer.bytes_transferred,
+            "seconds": transfer.seconds,
+            "mb_per_s": transfer.mb_per_s,
+            "slowest_mb_per_s": transfer.slowest_mb_per_s,
+        },
+    }
+
+
+def save_all(
+    osc: Rigol1000z,
+    mode: str,
+    data_path: str,
+    image_path: str,
+    sidecar_path: str,
+    progress=None,
+) -> Capture:
+    """
+    Stops the scope once, downloads the data and a screenshot of the same acquisition, and
+    saves both along with a JSON sidecar (see sidecar_metadata).
+
+    Everything is written to hidden partial files first (see util.partial_path), which are
+    only renamed into place once all of them are complete, with the sidecar last. If anything
+    fails or the download is cancelled, the partial files are deleted and existing files
+    are left alone; if one of the renames fails, the files already renamed are rolled back
+    (see _replace_all).
+
+    Args:
+        osc (Rigol1000z): The scope.
+        mode (str): Waveform mode (see Rigol1000z.capture).
+        data_path (str): Path of the data file. Its extension selects the format.
+        image_path (str): Path of the screenshot (PNG).
+        sidecar_path (str): Path of the JSON sidecar.
+        progress (Callable, optional): Progress callback for the download
+            (see Rigol1000z.capture).
+
+    Returns:
+        Capture: The downloaded capture.
+    """
+    # dicts keep their order, so the sidecar is renamed last
+    partials = {path: util.partial_path(path) for path in (data_path, image_path, sidecar_path)}
+    try:
+        capture, image = osc.capture_all(mode, writer_for_filename(partials[data_path]), progress)
+        with open(partials[image_path], "wb") as f:
+            f.write(image)
+        with open(partials[sidecar_path], "w") as f:
+            json.dump(sidecar_metadata(capture, data_path, image_path), f, indent=2)
+
+        # .rigolraw samples are mapped from the partial file, and a mapped file can't be
+        # renamed on Windows, so the mapping is closed first and reopened afterwards
+        mapped = isinstance(capture.raw, np.memmap)
+        if mapped:
+            capture.raw = None
+        _replace_all(partials)
+        if mapped:
+            capture.raw = load_capture(data_path).raw
+    except BaseException:
+        for partial in partials.values():
+            try:
+                os.remove(partial)
+            except OSError:
+                pass
+        raise
+    return capture
+
+
+def _replace_all(partials: dict[str, str]) -> None:
+    """
+    Renames partial files into place, in order. Files that would be overwritten are moved
+    aside first, so if a rename fails, the files already renamed are removed and the old
+    ones are put back before the error is raised.
+
+    Args:
+        partials (dict[str, str]): Partial file of each final path.
+    """
+    done = []  # (final path, where the file it replaces was moved, or None)
+    try:
+        for path, partial in partials.items():
+            backup = None
+            if os.path.exists(path):
+                backup = f"{partial}.old"
+                os.replace(path, backup)
+            done.append((path, backup))
+            os.replace(partial, path)
+    except BaseException:
+        for path, backup in reversed(done):
+            try:
+                if backup is None:
+                    os.remove(path)
+                else:
+                    os.replace(backup, path)
+            except OSError:
+                pass
+        raise
+    for _, backup in done:
+        if backup is not None:
+            try:
+                os.remove(backup)
+            except OSError:
+                pass
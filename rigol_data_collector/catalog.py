@@ -0,0 +1,386 @@
+"""
+SQLite catalog of saved data files and screenshots.
+
+MainApplication adds every file it saves, and the catalog can be rebuilt from the files in a
+set of directories. Run with --help for the command line interface.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+
+import util
+from Rigol1000z.capture import Capture
+from Rigol1000z.commands import PreambleContext
+
+DATA_EXTENSIONS = (".csv", ".parquet", ".rigolraw", ".npy", ".h5", ".hdf5")
+SCREENSHOT_EXTENSIONS = (".png", ".bmp", ".jpeg", ".jpg", ".tiff", ".tif")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    saved_at TEXT NOT NULL,
+    mtime REAL,
+    size INTEGER,
+    idn TEXT,
+    model TEXT,
+    serial TEXT,
+    points INTEGER,
+    metadata TEXT
+);
+CREATE TABLE IF NOT EXISTS channels (
+    path TEXT NOT NULL REFERENCES files(path) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    preamble TEXT,
+    scale REAL,
+    offset REAL,
+    min REAL,
+    max REAL,
+    mean REAL,
+    rms REAL,
+    PRIMARY KEY (path, name)
+);
+CREATE INDEX IF NOT EXISTS files_saved_at ON files(saved_at);
+CREATE INDEX IF NOT EXISTS files_serial ON files(serial);
+CREATE INDEX IF NOT EXISTS channels_name ON channels(name);
+"""
+
+
+def default_path() -> str:
+    """
+    Returns:
+        str: Path of the catalog database used by the GUI.
+    """
+    return os.path.join(util.app_data_dir(), "catalog.sqlite3")
+
+
+def channel_stats(capture: Capture, i: int) -> dict:
+    """
+    Summary statistics of one channel of a capture.
+
+    The statistics are computed from a histogram of the 256 possible raw values, so the
+    samples are only read once and never converted to voltages.
+
+    Args:
+        capture (Capture): The capture.
+        i (int): Index of the channel in capture.names.
+
+    Returns:
+        dict: min, max, mean and rms of the channel in volts (None if it has no points).
+    """
+    if not capture.points:
+        return {"min": None, "max": None, "mean": None, "rms": None}
+    counts = np.bincount(capture.raw[i], minlength=256)
+    volts = capture.preambles[i].to_voltage(np.arange(256, dtype=np.uint8))
+    present = np.nonzero(counts)[0]
+    return {
+        "min": float(volts[present].min()),
+        "max": float(volts[present].max()),
+        "mean": float(counts @ volts / capture.points),
+        "rms": float(np.sqrt(counts @ volts**2 / capture.points)),
+    }
+
+
+def _utc_iso(time: datetime) -> str:
+    """
+    Save times are stored as UTC ISO strings so they sort and compare as text.
+    Naive datetimes are taken to be local time.
+    """
+    return time.astimezone(timezone.utc).isoformat()
+
+
+class Catalog:
+    """
+    Index of saved files, stored in an SQLite database.
+
+    A connection is opened for each operation, so a Catalog can be shared between threads.
+    """
+
+    def __init__(self, path: str | None = None):
+        """
+        Args:
+            path (str | None, optional): Path of the database file. Defaults to default_path().
+        """
+        self.path = path or default_path()
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """
+        Open a connection that commits when the block succeeds and is always closed.
+        """
+        db = sqlite3.connect(self.path)
+        try:
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA foreign_keys = ON")
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def add(
+        self,
+        path: str,
+        kind: str,
+        capture: Capture | None = None,
+        idn: str | None = None,
+        saved_at: datetime | None = None,
+        names: list[str] | None = None,
+        preambles: list[PreambleContext] | None = None,
+        metadata: dict | None = None,
+    ) -> None:
+        """
+        Add a file to the catalog, replacing any existing entry for the same path.
+
+        Args:
+            path (str): Path of the file.
+            kind (str): "data" or "screenshot".
+            capture (Capture | None, optional): The data saved in the file. Provides the
+                channels, preambles, metadata and statistics.
+            idn (str | None, optional): IDN of the scope, if capture doesn't provide it.
+            saved_at (datetime | None, optional): When the file was saved. Defaults to the
+                capture time from the metadata, or the modification time of the file.
+            names (list[str] | None, optional): Channels in the file, if capture isn't given.
+            preambles (list[PreambleContext] | None, optional): Preambles of the channels,
+                if capture isn't given.
+            metadata (dict | None, optional): Capture metadata, if capture isn't given.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        if capture is not None:
+            names, preambles, metadata = capture.names, capture.preambles, capture.metadata
+        names = names or []
+        metadata = metadata or {}
+        idn = metadata.get("idn", idn)
+        model = serial = None
+        if idn:
+            idn = idn.strip()
+            _, model, serial, *_ = idn.split(",") + [None, None]
+        if saved_at is None:
+            saved_at = (
+                datetime.fromisoformat(metadata["time"])
+                if "time" in metadata
+                else datetime.fromtimestamp(stat.st_mtime).astimezone()
+            )
+
+        channel_rows = []
+        for i, name in enumerate(names):
+            settings = metadata.get("channels", {}).get(name, {})
+            stats = channel_stats(capture, i) if capture is not None else {}
+            channel_rows.append(
+                (
+                    path,
+                    name,
+                    preambles[i].preamble_str if preambles else None,
+                    settings.get("scale"),
+                    settings.get("offset"),
+                    stats.get("min"),
+                    stats.get("max"),
+                    stats.get("mean"),
+                    stats.get("rms"),
+                )
+            )
+
+        with self._connect() as db:
+            db.execute("DELETE FROM files WHERE path = ?", (path,))
+            db.execute(
+                "INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    path,
+                    kind,
+                    _utc_iso(saved_at),
+                    stat.st_mtime,
+                    stat.st_size,
+                    idn,
+                    model,
+                    serial,
+                    capture.points if capture is not None else None,
+                    json.dumps(metadata),
+                ),
+            )
+            db.executemany(
+                "INSERT INTO channels VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", channel_rows
+            )
+
+    def add_file(self, path: str) -> bool:
+        """
+        Add a file to the catalog using only what can be read from the file itself.
+
+        Args:
+            path (str): Path of the file.
+
+        Returns:
+            bool: True if the file was added, False if it isn't a known file type.
+        """
+        lower = path.lower()
+        if lower.endswith(SCREENSHOT_EXTENSIONS):
+            self.add(path, "screenshot")
+        elif lower.endswith(".rigolraw"):
+            from Rigol1000z.rigolraw import load_capture
+
+            self.add(path, "data", capture=load_capture(path))
+        elif lower.endswith(".parquet"):
+            from Rigol1000z.writers import read_parquet_info
+
+            names, preambles, metadata = read_parquet_info(path)
+            self.add(path, "data", names=names, preambles=preambles, metadata=metadata)
+        elif lower.endswith(".csv"):
+            with open(path) as f:
+                header = f.readline().strip().split(",")
+            self.add(path, "data", names=[name for name in header if name != "Time"])
+        elif lower.endswith(DATA_EXTENSIONS):
+            self.add(path, "data")
+        else:
+            return False
+        return True
+
+    def rebuild(self, directories: list[str]) -> int:
+        """
+        Clear the catalog and add every known file in the given directories.
+
+        Args:
+            directories (list[str]): Directories to search recursively.
+
+        Returns:
+            int: The number of files added.
+        """
+        with self._connect() as db:
+            db.execute("DELETE FROM files")
+        added = 0
+        for directory in directories:
+            for dirpath, _, filenames in os.walk(directory):
+                for name in filenames:
+                    try:
+                        added += self.add_file(os.path.join(dirpath, name))
+                    except (OSError, ValueError) as e:
+                        print(f"skipping {os.path.join(dirpath, name)}: {e}")
+        return added
+
+    def remove_missing(self) -> int:
+        """
+        Remove entries for files that no longer exist.
+
+        Returns:
+            int: The number of entries removed.
+        """
+        with self._connect() as db:
+            missing = [
+                (row["path"],)
+                for row in db.execute("SELECT path FROM files")
+                if not os.path.exists(row["path"])
+            ]
+            db.executemany("DELETE FROM files WHERE path = ?", missing)
+        return len(missing)
+
+    def find(
+        self,
+        kind: str | None = None,
+        serial: str | None = None,
+        model: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        channels: list[str] | None = None,
+        path_contains: str | None = None,
+    ) -> list[dict]:
+        """
+        Find files in the catalog. All given conditions must match.
+
+        Args:
+            kind (str | None, optional): "data" or "screenshot".
+            serial (str | None, optional): Serial number of the scope.
+            model (str | None, optional): Model of the scope.
+            since (datetime | None, optional): Earliest save time.
+            until (datetime | None, optional): Latest save time.
+            channels (list[str] | None, optional): Channels that must all be in the file,
+                e.g. ["CH1", "CH2"].
+            path_contains (str | None, optional): Substring of the path.
+
+        Returns:
+            list[dict]: The matching files, newest first. Each has the columns of the files
+                table and a "channels" list of dicts with the columns of the channels table.
+        """
+        conditions, params = [], []
+        for column, value in (("kind", kind), ("serial", serial), ("model", model)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            conditions.append("saved_at >= ?")
+            params.append(_utc_iso(since))
+        if until is not None:
+            conditions.append("saved_at <= ?")
+            params.append(_utc_iso(until))
+        if path_contains is not None:
+            conditions.append("instr(path, ?) > 0")
+            params.append(path_contains)
+        for name in channels or []:
+            conditions.append(
+                "EXISTS (SELECT 1 FROM channels c WHERE c.path = files.path AND c.name = ?)"
+            )
+            params.append(name)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self._connect() as db:
+            files = [
+                dict(row)
+                for row in db.execute(
+                    f"SELECT * FROM files {where} ORDER BY saved_at DESC", params
+                )
+            ]
+            for file in files:
+                file["metadata"] = json.loads(file["metadata"] or "{}")
+                file["channels"] = [
+                    dict(row)
+                    for row in db.execute(
+                        "SELECT * FROM channels WHERE path = ? ORDER BY name", (file["path"],)
+                    )
+                ]
+        return files
+
+
+def main(args: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Query or rebuild the capture catalog.")
+    parser.add_argument("--db", help="catalog database (defaults to the one used by the GUI)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser("rebuild", help="re-index all files in the given directories")
+    rebuild.add_argument("directories", nargs="+")
+
+    query = commands.add_parser("query", help="list catalogued files")
+    query.add_argument("--kind", choices=["data", "screenshot"])
+    query.add_argument("--serial")
+    query.add_argument("--model")
+    query.add_argument("--since", type=datetime.fromisoformat, help="ISO date/time")
+    query.add_argument("--until", type=datetime.fromisoformat, help="ISO date/time")
+    query.add_argument("--channel", action="append", dest="channels", help="e.g. CH1; repeatable")
+    query.add_argument("--path-contains")
+
+    options = parser.parse_args(args)
+    catalog = Catalog(options.db)
+
+    if options.command == "rebuild":
+        print(f"indexed {catalog.rebuild(options.directories)} files")
+    else:
+        for file in catalog.find(
+            options.kind,
+            options.serial,
+            options.model,
+            options.since,
+            options.until,
+            options.channels,
+            options.path_contains,
+        ):
+            channels = " ".join(c["name"] for c in file["channels"])
+            print(f'{file["saved_at"]}  {file["kind"]:<10}  {file["serial"] or "-":<16}  {channels:<15}  {file["path"]}')
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
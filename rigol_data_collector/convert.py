@@ -0,0 +1,121 @@
+"""
+Command line converter from .rigolraw captures to csv, npy or HDF5 files.
+
+Conversions run in parallel in a process pool, so a directory of captures saved on the
+acquisition host can be formatted on another machine. Run with --help for usage.
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from Rigol1000z.capture import write_capture
+from Rigol1000z.rigolraw import load_capture
+from Rigol1000z.writers import writer_for_filename
+
+FORMATS = {"csv": ".csv", "npy": ".npy", "hdf5": ".h5"}
+
+
+def find_captures(paths: list[str]) -> list[str]:
+    """
+    Expand a list of files and directories into the .rigolraw files they contain.
+
+    Args:
+        paths (list[str]): Files and directories. Directories are searched recursively.
+
+    Returns:
+        list[str]: Paths of .rigolraw files.
+    """
+    captures = []
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, _, filenames in os.walk(path):
+                captures += [
+                    os.path.join(dirpath, name)
+                    for name in sorted(filenames)
+                    if name.endswith(".rigolraw")
+                ]
+        else:
+            captures.append(path)
+    return captures
+
+
+def destination_path(source: str, extension: str, output_dir: str | None = None) -> str:
+    """
+    Path a .rigolraw file is converted to: the same name with the new extension.
+
+    Args:
+        source (str): Path of the .rigolraw file.
+        extension (str): Extension of the output file, which selects its format.
+        output_dir (str | None, optional): Directory to write the output to.
+            Defaults to the directory of the source file.
+
+    Returns:
+        str: Path of the output file.
+    """
+    name = os.path.splitext(os.path.basename(source))[0] + extension
+    return os.path.join(output_dir or os.path.dirname(source), name)
+
+
+def convert_file(source: str, extension: str, output_dir: str | None = None) -> str:
+    """
+    Convert a single .rigolraw file.
+
+    Args:
+        source (str): Path of the .rigolraw file.
+        extension (str): Extension of the output file, which selects its format.
+        output_dir (str | None, optional): Directory to write the output to.
+            Defaults to the directory of the source file.
+
+    Returns:
+        str: Path of the written file.
+    """
+    destination = destination_path(source, extension, output_dir)
+    write_capture(load_capture(source), writer_for_filename(destination))
+    return destination
+
+
+def main(args: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", nargs="+", help=".rigolraw files or directories containing them")
+    parser.add_argument("-t", "--to", choices=FORMATS, default="csv", help="output format")
+    parser.add_argument("-o", "--output-dir", help="directory for the converted files")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="number of worker processes")
+    options = parser.parse_args(args)
+
+    # a file given both directly and through its directory is converted once
+    sources = list({_normalize(source): source for source in find_captures(options.paths)}.values())
+    # files with the same name in different directories would be written to the same file in
+    # --output-dir at the same time, so this is refused before anything is converted
+    destinations = {}
+    for source in sources:
+        destination = destination_path(source, FORMATS[options.to], options.output_dir)
+        if _normalize(destination) in destinations:
+            other = destinations[_normalize(destination)]
+            parser.error(f"{other} and {source} would both be converted to {destination}")
+        destinations[_normalize(destination)] = source
+
+    if options.output_dir:
+        os.makedirs(options.output_dir, exist_ok=True)
+
+    failed = 0
+    with ProcessPoolExecutor(options.jobs) as executor:
+        futures = {
+            executor.submit(convert_file, source, FORMATS[options.to], options.output_dir): source
+            for source in sources
+        }
+        for future in as_completed(futures):
+            try:
+                print(f"{futures[future]} -> {future.result()}")
+            except Exception as e:
+                failed += 1
+                print(f"{futures[future]}: {e}")
+    return 1 if failed else 0
+
+
+def _normalize(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,172 @@
+"""
+Live view of the scope's screen data embedded in the Tk window.
+"""
+
+import threading
+import time
+import tkinter as tk
+from tkinter import StringVar, ttk
+from typing import Callable
+
+# colors the scope uses for each channel
+CHANNEL_COLORS = {"CH1": "#e0c000", "CH2": "#00c0e0", "CH3": "#e000e0", "CH4": "#2060ff"}
+
+
+class LiveView(ttk.LabelFrame):
+    """
+    LabelFrame that polls the screen data of the enabled channels on a background thread
+    and draws it with blitting, so only the traces are redrawn for each update.
+
+    The traces are drawn in screen units (0 is the bottom of the scope's screen and 255 the
+    top), which keeps the axes fixed no matter how the channels are scaled.
+
+    matplotlib is only imported when the live view is first started, so it doesn't slow down
+    the start of the app.
+    """
+
+    def __init__(self, parent, get_scope: Callable, scope_lock: threading.RLock, interval: float = 0.05, **kwargs):
+        """
+        Args:
+            parent: Parent widget.
+            get_scope (Callable): Returns the connected Rigol1000z, or None.
+            scope_lock (threading.RLock): Held while the scope is being polled, so other scope
+                I/O can't be interleaved with it.
+            interval (float, optional): Minimum time between updates in seconds.
+                Defaults to 0.05 (20 updates per second).
+        """
+        ttk.LabelFrame.__init__(self, parent, text="Live View", **kwargs)
+        self.get_scope = get_scope
+        self.scope_lock = scope_lock
+        self.interval = interval
+
+        self.status = StringVar(value="Stopped.")
+        self._thread = None
+        self._running = threading.Event()
+        # the latest frame from the polling thread; older frames are simply replaced
+        self._frame = None
+        self._frame_lock = threading.Lock()
+        self._frame_times = []
+
+        # stands in for the figure (at the same size) until the live view is started
+        self.figure = None
+        self._placeholder = ttk.Frame(self, width=600, height=300)
+        self._placeholder.grid_propagate(False)
+        self._placeholder.grid(column=0, row=0, columnspan=3, sticky=tk.NSEW)
+        ttk.Label(self._placeholder, text="Press Start to show the scope's screen.").place(
+            relx=0.5, rely=0.5, anchor=tk.CENTER
+        )
+
+        ttk.Button(self, text="Start", command=self.start).grid(column=0, row=1, sticky=tk.EW)
+        ttk.Button(self, text="Stop", command=self.stop).grid(column=1, row=1, sticky=tk.EW)
+        ttk.Label(self, textvariable=self.status).grid(column=2, row=1, sticky=tk.E, padx=10)
+
+    def start(self) -> None:
+        """
+        Starts polling the scope, if it's connected.
+        """
+        if self._running.is_set():
+            return
+        if self.get_scope() is None:
+            self.status.set("Scope not connected.")
+            return
+        if self.figure is None:
+            self._create_figure()
+        # each polling thread gets its own flag, so a thread that is still finishing its
+        # last poll after stop() can't be revived by a quick restart
+        self._running = threading.Event()
+        self._running.set()
+        self._thread = threading.Thread(target=self._poll_scope, args=(self._running,), daemon=True)
+        self._thread.start()
+        self.after(0, self._update)
+
+    def _create_figure(self) -> None:
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+
+        self.figure = Figure(figsize=(6, 3), dpi=100)
+        self.ax = self.figure.add_subplot()
+        self.ax.set_xlim(0, 1199)
+        self.ax.set_ylim(0, 255)
+        self.ax.set_xlabel("Screen point")
+        self.ax.set_ylabel("Screen position")
+        self.lines = {
+            name: self.ax.plot([], [], color=color, label=name, animated=True)[0]
+            for name, color in CHANNEL_COLORS.items()
+        }
+        self.ax.legend(loc="upper right", fontsize="small")
+        self.figure.tight_layout()
+
+        self._placeholder.destroy()
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self)
+        self.canvas.get_tk_widget().grid(column=0, row=0, columnspan=3, sticky=tk.NSEW)
+        self._background = None
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def stop(self) -> None:
+        """
+        Stops polling the scope. The last frame stays on screen.
+        """
+        self._running.clear()
+        self.status.set("Stopped.")
+
+    def _poll_scope(self, running: threading.Event) -> None:
+        """
+        Runs on the polling thread; reads frames until stopped or the scope fails.
+        """
+        while running.is_set():
+            started = time.perf_counter()
+            try:
+                with self.scope_lock:
+                    scope = self.get_scope()
+                    if scope is None:
+                        raise ConnectionError("Scope not connected.")
+                    frame = scope.get_screen_data()
+            except Exception as e:
+                with self._frame_lock:
+                    self._frame = e
+                running.clear()
+                return
+            with self._frame_lock:
+                self._frame = frame
+            time.sleep(max(0.0, self.interval - (time.perf_counter() - started)))
+
+    def _update(self) -> None:
+        """
+        Runs on the Tk thread; draws the latest frame, if there's a new one.
+        """
+        with self._frame_lock:
+            frame, self._frame = self._frame, None
+
+        if isinstance(frame, Exception):
+            self.status.set(f"Stopped: {frame}")
+        elif frame is not None:
+            self._draw(frame)
+
+        if self._running.is_set():
+            self.after(int(self.interval * 500), self._update)
+
+    def _on_draw(self, event) -> None:
+        # everything except the traces is saved and restored for each update
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+        for line in self.lines.values():
+            self.ax.draw_artist(line)
+
+    def _draw(self, frame) -> None:
+        for name, line in self.lines.items():
+            if name in frame.names:
+                data = frame.raw[frame.names.index(name)]
+                line.set_data(range(len(data)), data)
+            else:
+                line.set_data([], [])
+
+        if self._background is None:
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self._background)
+            for line in self.lines.values():
+                self.ax.draw_artist(line)
+            self.canvas.blit(self.ax.bbox)
+
+        now = time.perf_counter()
+        self._frame_times = [t for t in self._frame_times if now - t < 1.0] + [now]
+        self.status.set(f"{len(self._frame_times)} updates/s")
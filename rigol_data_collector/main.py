@@ -1,4 +1,6 @@
+import importlib
 import os
+import threading
 from typing import Callable
 from datetime import datetime
 import tkinter as tk
@@ -6,14 +8,24 @@ from tkinter import filedialog, messagebox
 from tkinter import StringVar
 from tkinter import ttk
 
-from pyvisa import ResourceManager
-import matplotlib.pyplot as plt
-from pandas import read_csv
-
 import util
+from catalog import Catalog
 from pathcheck_so import is_path_exists_or_creatable
-from Rigol1000z import Rigol1000z
+from Rigol1000z import Rigol1000z, Capture, CaptureCancelled, TransferProgress
 from Rigol1000z.constants import EWaveformMode
+from Rigol1000z.writers import writer_for_filename
+from plotting import PlotDataCache, DECIMATION_METHODS, connect_zoom
+from liveview import LiveView
+from scheduler import SchedulerPanel
+from supervisor import ConnectionSupervisor
+from worker import ScopeWorker
+from capture_all import save_all
+
+# supported data file extensions; .csv is added to names without one of these
+DATA_EXTENSIONS = (".csv", ".parquet", ".rigolraw")
+
+# slow to import and only needed for plotting, so they're imported after the window is shown
+DEFERRED_MODULES = ("pandas", "matplotlib.pyplot", "matplotlib.backends.backend_tkagg")
 
 
 class MainApplication(tk.Frame):
@@ -23,18 +35,39 @@ class MainApplication(tk.Frame):
 
         self.osc = None
         self.visa_name, self.visa_backend = "", ""
+        # held during scope I/O so the live view can't interleave commands with other actions
+        self.scope_lock = threading.RLock()
+        # all other scope I/O runs on this worker so the window stays responsive
+        self.worker = ScopeWorker(self, self.scope_lock)
+        # reconnects to the scope if the connection is lost
+        self.supervisor = ConnectionSupervisor(
+            self.scope_lock,
+            on_lost=lambda error: self.worker.post(self.connection_lost, error),
+            on_reconnected=self.scope_reconnected,
+        )
+
+        # index of saved files; optional, so the app still starts if it can't be opened
+        try:
+            self.catalog = Catalog()
+        except Exception as e:
+            print(f"Couldn't open the catalog, saved files won't be cataloged: {e}")
+            self.catalog = None
+        # data read by the plot buttons
+        self.plot_cache = PlotDataCache()
 
         # variables to store user input
         self.data_fpath = StringVar()
         self.data_fname = StringVar()
         self.scrshot_fpath = StringVar()
         self.scrshot_fname = StringVar()
+        self.plot_decimation = StringVar(value="min/max")
 
         # variables to store status text
         self.scope_connected = StringVar()
         self.scope_connected.set("Scope disconnected.")  # default value
         self.data_save_time = StringVar()
         self.scrshot_save_time = StringVar()
+        self.transfer_status = StringVar(value="Idle.")
 
         # callback to disconnect scope before window closes
         self.parent.protocol("WM_DELETE_WINDOW", self.on_close)
@@ -55,7 +88,7 @@ class MainApplication(tk.Frame):
         )
 
         # frame for exporting data
-        self.create_file_save_frame(
+        data_lf = self.create_file_save_frame(
             1,
             0,
             "Save Data",
@@ -66,6 +99,10 @@ class MainApplication(tk.Frame):
             self.browse_data_path,
             self.save_data,
         )
+        # saves the data and a screenshot of the same acquisition together
+        ttk.Button(
+            data_lf, text="Save data + screenshot", command=self.save_data_and_screenshot
+        ).grid(column=1, row=3)
 
         # frame for plotting data previews
         plot_lf = ttk.LabelFrame(self, text="Plot Data")
@@ -91,6 +128,15 @@ class MainApplication(tk.Frame):
             text=f"Plot CH4 data",
             command=lambda: self.plot(4),
         ).grid(column=3, row=0, sticky=tk.EW)
+        # how to reduce long records before plotting them
+        ttk.Label(plot_lf, text="Decimation:").grid(column=0, row=1, sticky=tk.E)
+        ttk.Combobox(
+            plot_lf,
+            textvariable=self.plot_decimation,
+            values=list(DECIMATION_METHODS),
+            state="readonly",
+            width=10,
+        ).grid(column=1, row=1, sticky=tk.W)
 
         # frame for exporting screenshots
         self.create_file_save_frame(
@@ -105,6 +151,28 @@ class MainApplication(tk.Frame):
             self.save_scrshot,
         )
 
+        # frame for the progress of the current transfer
+        transfer_lf = ttk.LabelFrame(self, text="Transfer")
+        transfer_lf.grid(row=4, column=0, padx=20, pady=20, sticky=tk.EW)
+        self.progress_bar = ttk.Progressbar(transfer_lf, length=300)
+        self.progress_bar.grid(column=0, row=0, sticky=tk.EW)
+        ttk.Button(transfer_lf, text="Cancel", command=self.cancel_transfer).grid(
+            column=1, row=0, padx=10
+        )
+        ttk.Label(transfer_lf, textvariable=self.transfer_status).grid(
+            column=0, row=1, columnspan=2, sticky=tk.W
+        )
+
+        # live view of the scope's screen
+        self.live_view = LiveView(self, lambda: self.osc, self.scope_lock)
+        self.live_view.grid(row=0, column=1, rowspan=3, padx=20, pady=20, sticky=tk.NSEW)
+
+        # unattended captures on an interval or on every trigger
+        self.scheduler = SchedulerPanel(
+            self, lambda: self.osc, self.scope_lock, DATA_EXTENSIONS, on_saved=self.add_to_catalog
+        )
+        self.scheduler.grid(row=3, column=1, rowspan=2, padx=20, pady=20, sticky=tk.NSEW)
+
     def plot(self, channel: int) -> None:
         """
         Plots the data from the specified channel from the currently selected data file.
@@ -114,27 +182,49 @@ class MainApplication(tk.Frame):
             channel (int): The channel number to plot (1-4).
         """
         # make sure the data file exists; tell the user if it doesn't
-        full_path = util.add_extension_if_needed(
-            os.path.join(self.data_fpath.get(), self.data_fname.get()), ".csv"
-        )
+        full_path = self.data_file_path()
         if not os.path.isfile(full_path):
             messagebox.showwarning(message="The specified data file doesn't exist!")
             return
-        data = read_csv(full_path)  # read in the data
+        # imported here to keep it off the startup path (see warm_up_imports)
+        import matplotlib.pyplot as plt
+
         try:
+            # read the file, or reuse the data if it was plotted before and hasn't changed
+            time, volts = self.plot_cache.get(full_path, channel)
+            if len(time) == 0:
+                messagebox.showwarning(message=f"{self.data_fname.get()} has no data to plot.")
+                return
+            view = self.plot_cache.get_view(full_path, channel, self.plot_decimation.get())
             # select the figure dedicated to the chosen channel and clear it
-            plt.figure(channel, clear=True)
-            # plot and label the data
-            plt.plot(data["Time"], data[f"CH{channel}"])
+            fig = plt.figure(channel, clear=True)
+            ax = fig.gca()
+            # plot the data reduced to the width of the figure, and redraw it on zoom/pan
+            width = fig.get_size_inches()[0] * fig.dpi
+            (line,) = ax.plot(*view.view(time[0], time[-1], width))
+            connect_zoom(ax, line, view.view)
+            # label the data
             plt.title(f"{self.data_fname.get()}: CH{channel}")
             plt.xlabel("Time [s]")
             plt.ylabel(f"CH{channel} [V]")
             plt.show()
-        except KeyError:
+        except (KeyError, ValueError):
             messagebox.showwarning(
-                message="Couldn't plot data from channel {channel}; did you modify the column labels of the csv?"
+                message=f"Couldn't plot data from channel {channel}; did you modify the column labels of the csv?"
             )
 
+    def data_file_path(self) -> str:
+        """
+        Builds the path of the data file from the text entries. Adds the .csv extension
+        unless the name already ends with one of DATA_EXTENSIONS.
+
+        Returns:
+            str: Full path of the selected data file.
+        """
+        return util.add_extension_if_needed(
+            os.path.join(self.data_fpath.get(), self.data_fname.get()), DATA_EXTENSIONS
+        )
+
     def create_file_save_frame(
         self,
         row: int,
@@ -146,7 +236,7 @@ class MainApplication(tk.Frame):
         status_var: StringVar,
         browse_func: Callable,
         save_func: Callable,
-    ):
+    ) -> ttk.LabelFrame:
         """
         Create a LabelFrame in the GUI containing widgets for inputting a file path
         and name, a button for saving a file, and text to display when a file was
@@ -163,6 +253,9 @@ class MainApplication(tk.Frame):
             browse_func (Callable): Callback for browsing directories ('...' button)
                 to select a file path.
             save_func (Callable): Callback for saving a file. (Save file button)
+
+        Returns:
+            ttk.LabelFrame: The frame, so more widgets can be added to it.
         """
         # LabelFrame to contain other widgets
         lf = ttk.LabelFrame(self, text=frame_label)
@@ -181,45 +274,118 @@ class MainApplication(tk.Frame):
         # save button and status text
         ttk.Button(lf, text=save_button_text, command=save_func).grid(column=1, row=2)
         ttk.Label(lf, textvariable=status_var).grid(column=2, row=2)
+        return lf
 
     def on_close(self) -> None:
         """
         Called when the window is closed to disconnect the scope before closing.
+        A running transfer is cancelled first. Files queued by the scheduler are still written.
         """
-        self.disconnect_scope()
-        self.parent.destroy()
+        self.live_view.stop()
+        self.scheduler.close()
+        self.supervisor.stop()
+        self.cancel_transfer()
+
+        def disconnected() -> None:
+            self.worker.shutdown()
+            util.resource_pool.close_idle()
+            self.parent.destroy()
+
+        self.disconnect_scope(on_done=disconnected)
 
     def connect_scope(self) -> None:
         """
         Open the VISA resource to establish the communication channel.
+        The scope is found and opened on the worker thread.
         """
+        if self.check_scope_connected():
+            return
         self.scope_connected.set("Connecting to scope...")
-        self.scope_status_label.update()
-        if not self.check_scope_connected():
-            if self.visa_name == "":
-                visas = util.find_visas()
-                try:
-                    self.visa_name, self.visa_backend = visas[0]
-                except IndexError:
-                    self.visa_name, self.visa_backend = ("", "")
-            try:
-                self.visa_rsrc = ResourceManager(self.visa_backend).open_resource(
-                    self.visa_name
-                )
-                self.osc = Rigol1000z(self.visa_rsrc)
-            except:
-                messagebox.showwarning(
-                    message="Error connecting to scope. Check USB connection."
-                )
+        self.worker.submit(
+            self.open_scope,
+            self.visa_name,
+            self.visa_backend,
+            on_done=self.scope_opened,
+            on_error=self.scope_open_failed,
+        )
+
+    def open_scope(self, visa_name: str, visa_backend: str) -> tuple:
+        """
+        Runs on the worker thread. Opens the scope, trying the last used and the previously
+        connected addresses before searching for one (see util.connect_scope).
+
+        Args:
+            visa_name (str): VISA address of the scope, or "" if none is known yet.
+            visa_backend (str): VISA backend to open the address with.
+
+        Returns:
+            tuple: The VISA address, backend, resource and Rigol1000z of the opened scope.
+        """
+        visa_name, visa_backend, osc = util.connect_scope(visa_name, visa_backend)
+        return visa_name, visa_backend, osc.visa_resource, osc
+
+    def scope_opened(self, result: tuple) -> None:
+        """
+        Called on the Tk thread when open_scope succeeds.
+        """
+        self.visa_name, self.visa_backend, self.visa_rsrc, self.osc = result
         self.check_scope_connected()  # update scope connected text
+        self.supervisor.watch(self.visa_name, self.visa_backend, self.osc)
+
+    def scope_open_failed(self, error: Exception) -> None:
+        """
+        Called on the Tk thread when open_scope fails.
+        """
+        self.check_scope_connected()  # update scope connected text
+        messagebox.showwarning(message="Error connecting to scope. Check USB connection.")
+
+    def connection_lost(self, error: Exception) -> None:
+        """
+        Called on the Tk thread when the supervisor's heartbeat fails.
+        """
+        self.scope_connected.set("Connection lost; reconnecting...")
+
+    def scope_reconnected(self, visa_name: str, visa_backend: str, osc: Rigol1000z, lost_since: float) -> None:
+        """
+        Called on the supervisor's thread, while it holds the scope lock, after the scope was
+        reconnected. The new scope is used from here on; the status is updated and scheduled
+        captures that failed since the connection was lost are resumed on the Tk thread.
+        """
+        self.visa_name, self.visa_backend, self.visa_rsrc, self.osc = (
+            visa_name,
+            visa_backend,
+            osc.visa_resource,
+            osc,
+        )
+
+        def reconnected() -> None:
+            self.check_scope_connected()  # update scope connected text
+            self.scheduler.resume(lost_since)
+
+        self.worker.post(reconnected)
 
-    def disconnect_scope(self) -> None:
+    def disconnect_scope(self, on_done: Callable | None = None) -> None:
         """
         Close the VISA resource to terminate the communication channel.
+        The resource is closed on the worker thread once the running job has finished.
+
+        Args:
+            on_done (Callable | None, optional): Called without arguments on the Tk thread
+                once the scope is disconnected (or if it wasn't connected).
         """
-        if self.check_scope_connected():
-            self.visa_rsrc.close()
+        self.supervisor.unwatch()
+        visa_rsrc = self.visa_rsrc if self.check_scope_connected() else None
+
+        def disconnected(_) -> None:
             self.check_scope_connected()  # update scope connected text
+            if on_done is not None:
+                on_done()
+
+        self.worker.submit(
+            lambda: visa_rsrc is not None and visa_rsrc.close(),
+            on_done=disconnected,
+            on_error=disconnected,
+        )
 
     def check_scope_connected(self) -> bool:
         """
@@ -252,64 +418,63 @@ class MainApplication(tk.Frame):
         """
         Calls save_file with proper arguments for data saving.
         """
-        try:
-            self.save_file(
-                ".csv",
-                self.data_fpath,
-                self.data_fname,
-                self.data_save_time,
-                self.osc.get_data,  # type:ignore
-                leading_args=[EWaveformMode.Raw],
-            )
-        except:
-            messagebox.showwarning(
-                message="Couldn't save data! Is the scope connected?"
-            )
+        self.save_file(
+            DATA_EXTENSIONS,
+            self.data_fpath,
+            self.data_fname,
+            self.data_save_time,
+            # stream straight to the file without converting the capture to voltages
+            lambda mode, path: self.osc.capture(  # type:ignore
+                mode, writer_for_filename(path), self.report_progress
+            ),
+            "Couldn't save data! Is the scope connected?",
+            leading_args=[EWaveformMode.Raw],
+        )
 
     def save_scrshot(self) -> None:
         """
         Calls save_file with proper arguments for screenshot saving.
         """
-        try:
-            self.save_file(
-                ".png",
-                self.scrshot_fpath,
-                self.scrshot_fname,
-                self.scrshot_save_time,
-                self.osc.get_screenshot,  # type:ignore
-            )
-        except:
-            messagebox.showwarning(
-                message="Couldn't save screenshot! Is the scope connected?"
-            )
+        self.save_file(
+            ".png",
+            self.scrshot_fpath,
+            self.scrshot_fname,
+            self.scrshot_save_time,
+            lambda path: self.osc.get_screenshot(path),  # type:ignore
+            "Couldn't save screenshot! Is the scope connected?",
+        )
 
     def save_file(
         self,
-        extension: str,
+        extension: str | tuple[str, ...],
         path_var: StringVar,
         name_var: StringVar,
         status_var: StringVar,
         save_func: Callable,
+        error_message: str,
         leading_args=[],
     ) -> None:
         """
         Saves a file after checking that the path is available and the scope is connected.
 
         Shows a warning dialog if no scope is connected or if the chosen path can't be used.
-        Otherwise, it calls save_func and updates the provided status_var with the current time.
+        Otherwise, it calls save_func on the worker thread and, once it's done, updates the
+        provided status_var with the current time.
 
         Args:
-            extension (str): File extension to use for the saved file.
+            extension (str | tuple[str, ...]): File extension to use for the saved file.
+                See util.add_extension_if_needed.
             path_var (StringVar): tk StringVar containing path to save file to.
             name_var (StringVar): tk StringVar containing desired name of the file.
             status_var (StringVar): tk StringVar to write a status message to.
             save_func (Callable): Function to call in order to save the file.
                 It is passed any arguments from leading_args followed by the file path.
+                It runs on the worker thread.
+            error_message (str): Warning to show if save_func fails.
             leading_args (list, optional): Arguments to precede the file path in save_func.
                 Defaults to [].
         """
         if self.check_scope_connected():
-            self.osc.stop()  # stop scope collection so it can be read  # type:ignore
             full_path = util.add_extension_if_needed(
                 os.path.join(path_var.get(), name_var.get()), extension
             )
@@ -324,15 +489,149 @@ class MainApplication(tk.Frame):
                     message="Chosen file path is invalid or inaccessible."
                 )
                 return
-            # save the file
-            save_func(*leading_args, full_path)
-            # update the status message with the name of the saved file and the current time
-            status_var.set(
-                f'{os.path.basename(full_path)} saved at {datetime.now().strftime("%I:%M:%S %p")}'
-            )
+
+            def save():
+                # runs on the worker thread, which holds the scope lock
+                self.osc.stop()  # stop scope collection so it can be read  # type:ignore
+                result = save_func(*leading_args, full_path)
+                self.add_to_catalog(full_path, result)
+                return result
+
+            def saved(result) -> None:
+                if isinstance(result, Capture) and result.transfer is not None:
+                    print(f"{full_path}: {result.transfer}")
+                    self.end_transfer(
+                        f"Saved {os.path.basename(full_path)} ({result.transfer.mb_per_s:.2f} MB/s)."
+                    )
+                else:
+                    self.end_transfer(f"Saved {os.path.basename(full_path)}.")
+                # update the status message with the name of the saved file and the current time
+                status_var.set(
+                    f'{os.path.basename(full_path)} saved at {datetime.now().strftime("%I:%M:%S %p")}'
+                )
+
+            def failed(error: Exception) -> None:
+                if isinstance(error, CaptureCancelled):
+                    # don't leave a partial file behind
+                    try:
+                        os.remove(full_path)
+                    except OSError:
+                        pass
+                    self.end_transfer("Cancelled.")
+                else:
+                    self.end_transfer("Failed.")
+                    messagebox.showwarning(message=error_message)
+
+            self.start_transfer(f"Saving {os.path.basename(full_path)}...")
+            self.worker.submit(save, on_done=saved, on_error=failed)
         else:
             messagebox.showwarning(message="Scope not connected!")
 
+    def save_data_and_screenshot(self) -> None:
+        """
+        Saves the data, a screenshot and a JSON metadata sidecar of the same acquisition,
+        named after the data file (e.g. data.csv, data.png and data.json). The scope is
+        only stopped once, and none of the files are replaced unless all of them are saved.
+        """
+        if not self.check_scope_connected():
+            messagebox.showwarning(message="Scope not connected!")
+            return
+        data_path = self.data_file_path()
+        base = os.path.splitext(data_path)[0]
+        paths = [data_path, base + ".png", base + ".json"]
+        # if any of the files exist already, confirm whether they should be overwritten
+        if any(os.path.isfile(path) for path in paths) and not messagebox.askokcancel(
+            message="Files already exist with the specified name and location. \
+            Would you like to overwrite them?"
+        ):
+            return
+        if not is_path_exists_or_creatable(data_path):
+            messagebox.showwarning(message="Chosen file path is invalid or inaccessible.")
+            return
+
+        def save():
+            # runs on the worker thread, which holds the scope lock
+            capture = save_all(self.osc, EWaveformMode.Raw, *paths, progress=self.report_progress)  # type:ignore
+            self.add_to_catalog(paths[0], capture)
+            self.add_to_catalog(paths[1], None)
+            return capture
+
+        def saved(capture: Capture) -> None:
+            if capture.transfer is not None:
+                print(f"{data_path}: {capture.transfer}")
+            self.end_transfer(f"Saved {os.path.basename(base)}.*")
+            saved_at = datetime.now().strftime("%I:%M:%S %p")
+            self.data_save_time.set(f"{os.path.basename(paths[0])} saved at {saved_at}")
+            self.scrshot_save_time.set(f"{os.path.basename(paths[1])} saved at {saved_at}")
+
+        def failed(error: Exception) -> None:
+            if isinstance(error, CaptureCancelled):
+                self.end_transfer("Cancelled.")
+            else:
+                self.end_transfer("Failed.")
+                messagebox.showwarning(message="Couldn't save data and screenshot! Is the scope connected?")
+
+        self.start_transfer(f"Saving {os.path.basename(base)}.*...")
+        self.worker.submit(save, on_done=saved, on_error=failed)
+
+    def report_progress(self, progress: TransferProgress) -> None:
+        """
+        Progress callback for downloads. Runs on the worker thread; stops the download if
+        the transfer was cancelled, and otherwise shows the progress on the Tk thread.
+
+        Args:
+            progress (TransferProgress): Progress after the latest block.
+        """
+        self.worker.raise_if_cancelled()
+        self.worker.post(self.show_progress, progress)
+
+    def start_transfer(self, message: str) -> None:
+        """
+        Shows an indeterminate progress bar until the first progress report arrives.
+        """
+        self.transfer_status.set(message)
+        self.progress_bar.configure(mode="indeterminate", value=0)
+        self.progress_bar.start()
+
+    def show_progress(self, progress: TransferProgress) -> None:
+        self.progress_bar.stop()
+        self.progress_bar.configure(mode="determinate", maximum=1, value=progress.fraction)
+        self.transfer_status.set(
+            f"{progress.channel}: {progress.points_done:,} of {progress.points_total:,} points"
+            f" ({progress.mb_per_s:.2f} MB/s)"
+        )
+
+    def end_transfer(self, message: str) -> None:
+        self.progress_bar.stop()
+        self.progress_bar.configure(mode="determinate", value=0)
+        self.transfer_status.set(message)
+
+    def cancel_transfer(self) -> None:
+        """
+        Stops the running download after its current block.
+        """
+        self.worker.cancel()
+
+    def add_to_catalog(self, full_path: str, result) -> None:
+        """
+        Adds a saved file to the catalog. Failing to update the catalog doesn't stop
+        the file from being saved, so errors are only printed. Does nothing if the catalog
+        couldn't be opened. Safe to call from any thread.
+
+        Args:
+            full_path (str): Path of the saved file.
+            result: The value returned by the save function; a Capture for data files.
+        """
+        if self.catalog is None:
+            return
+        try:
+            if isinstance(result, Capture):
+                self.catalog.add(full_path, "data", capture=result)
+            else:
+                self.catalog.add(full_path, "screenshot", idn=self.osc._idn_cache)  # type:ignore
+        except Exception as e:
+            print(f"Couldn't add {full_path} to the catalog: {e}")
+
     def select_path(self, title: str, path_var: StringVar) -> None:
         """
         Opens a dialog to select a directory, and updates a StringVar with the path selected.
@@ -354,9 +653,26 @@ class MainApplication(tk.Frame):
             )
 
 
+def warm_up_imports() -> None:
+    """
+    Imports DEFERRED_MODULES on a background thread, so the first plot or live view doesn't
+    have to wait for them. Call it once the window is shown.
+    """
+    threading.Thread(
+        target=lambda: [importlib.import_module(name) for name in DEFERRED_MODULES],
+        daemon=True,
+    ).start()
+
+
 if __name__ == "__main__":
     root = tk.Tk()
     root.resizable(width=False, height=False)
     root.title("Rigol Data Collection")
-    MainApplication(root).grid(row=0, column=0, sticky=tk.NSEW)
-    root.mainloop()
+    app = MainApplication(root)
+    app.grid(row=0, column=0, sticky=tk.NSEW)
+    root.after_idle(warm_up_imports)
+    try:
+        root.mainloop()
+    finally:
+        # on_close isn't called if the loop ends some other way, e.g. Ctrl+C in the terminal
+        app.scheduler.close()
@@ -0,0 +1,373 @@
+"""
+Loading, caching and decimation of saved data files for the plot buttons.
+"""
+
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from Rigol1000z.rigolraw import load_capture
+from Rigol1000z.writers import read_parquet_channel
+
+
+def load_channels(path: str, channel: int) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+    """
+    Reads the time series and voltages from a data file saved by this program.
+
+    csv files are parsed once for all channel columns, since parsing the text is what takes
+    time. Other formats are read one column at a time. Voltages are float32.
+
+    Args:
+        path (str): Path of a .csv, .parquet or .rigolraw file.
+        channel (int): The channel that is needed (1-4).
+
+    Returns:
+        tuple[np.ndarray, dict[str, np.ndarray]]: The time series and a dict of voltages
+            keyed by column label (e.g. "CH1"). Contains at least the requested channel.
+
+    Raises:
+        KeyError: If the file doesn't contain the channel.
+    """
+    name = f"CH{channel}"
+    if path.endswith(".parquet"):
+        time, volts = read_parquet_channel(path, channel)
+        return time, {name: volts.astype(np.float32, copy=False)}
+    if path.endswith(".rigolraw"):
+        capture = load_capture(path)
+        if name not in capture.names:
+            raise KeyError(name)
+        return capture.time_series, {name: capture.voltage(capture.names.index(name), np.float32)}
+
+    with open(path) as f:
+        header = f.readline().strip().split(",")
+    if "Time" not in header or name not in header:
+        raise KeyError(name)
+    names = [column for column in header if column.startswith("CH")]
+    # pandas takes a while to import, so it's only loaded once a csv file is plotted
+    from pandas import read_csv
+
+    data = read_csv(
+        path,
+        usecols=["Time", *names],
+        dtype={"Time": np.float64, **{column: np.float32 for column in names}},
+    )
+    return data["Time"].to_numpy(), {column: data[column].to_numpy() for column in names}
+
+
+class PlotDataCache:
+    """
+    Least recently used cache of the data read from saved files.
+
+    Entries are keyed by path and are dropped when the file's modification time or size
+    changes. Whole files are evicted, least recently used first, once the arrays held
+    exceed the memory budget.
+    """
+
+    def __init__(self, max_bytes: int = 1024 * 2**20):
+        """
+        Args:
+            max_bytes (int, optional): Memory budget for the cached arrays. Defaults to 1 GiB.
+                The most recently used file is always kept, even if it is larger.
+        """
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+
+    def get(self, path: str, channel: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the time series and voltages of a channel, reading the file if needed.
+
+        Args:
+            path (str): Path of the data file.
+            channel (int): The channel number (1-4).
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The time series and voltages of the channel.
+
+        Raises:
+            KeyError: If the file doesn't contain the channel.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        name = f"CH{channel}"
+
+        entry = self._entries.get(path)
+        if entry is None or entry["signature"] != signature:
+            entry = {"signature": signature, "time": None, "channels": {}, "views": {}}
+            self._entries[path] = entry
+        self._entries.move_to_end(path)
+
+        if name not in entry["channels"]:
+            time, channels = load_channels(path, channel)
+            if entry["time"] is None:
+                entry["time"] = time
+            entry["channels"].update(channels)
+            self._evict()
+
+        return entry["time"], entry["channels"][name]
+
+    def get_view(self, path: str, channel: int, method: str):
+        """
+        Returns the zoomable view of a channel for a decimation method, building it the
+        first time (e.g. the min/max pyramid) and reusing it afterwards.
+
+        Args:
+            path (str): Path of the data file.
+            channel (int): The channel number (1-4).
+            method (str): One of DECIMATION_METHODS.
+
+        Returns:
+            An object with a view(xmin, xmax, width) method.
+        """
+        time, volts = self.get(path, channel)
+        views = self._entries[os.path.abspath(path)]["views"]
+        key = (channel, method)
+        if key not in views:
+            views[key] = DECIMATION_METHODS[method](time, volts)
+            self._evict()
+        return views[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(self._entry_nbytes(entry) for entry in self._entries.values())
+
+    @staticmethod
+    def _entry_nbytes(entry: dict) -> int:
+        time_nbytes = entry["time"].nbytes if entry["time"] is not None else 0
+        return (
+            time_nbytes
+            + sum(volts.nbytes for volts in entry["channels"].values())
+            + sum(view.nbytes for view in entry["views"].values())
+        )
+
+    def _evict(self) -> None:
+        while len(self._entries) > 1 and self.nbytes > self.max_bytes:
+            self._entries.popitem(last=False)
+
+
+def minmax_envelope(x: np.ndarray, y: np.ndarray, bins: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Reduces a record to the minimum and maximum of each of `bins` equal slices, kept in
+    their original order. Drawn as a line, this looks the same as the full record at a
+    width of `bins` pixels, including single-sample peaks and glitches.
+
+    Args:
+        x (np.ndarray): Sample times.
+        y (np.ndarray): Sample values.
+        bins (int): Number of slices, usually the width of the plot in pixels.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: At most 2 * (bins + 1) points of the record.
+    """
+    n = len(y)
+    if n <= 2 * bins:
+        return x, y
+    size = n // bins
+    full = size * bins
+
+    sliced = y[:full].reshape(bins, size)
+    imin, imax = sliced.argmin(axis=1), sliced.argmax(axis=1)
+    offsets = np.arange(bins) * size
+    idx = np.column_stack((np.minimum(imin, imax) + offsets, np.maximum(imin, imax) + offsets)).ravel()
+    if full < n:
+        tail = y[full:]
+        idx = np.concatenate((idx, full + np.sort([tail.argmin(), tail.argmax()])))
+    return x[idx], y[idx]
+
+
+def lttb(x: np.ndarray, y: np.ndarray, points: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Largest-Triangle-Three-Buckets downsampling. Picks one sample per bucket so the
+    shape of the record is preserved with fewer points than minmax_envelope, but
+    isolated peaks can be lost.
+
+    Args:
+        x (np.ndarray): Sample times.
+        y (np.ndarray): Sample values.
+        points (int): Number of points to keep (at least 3).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: `points` samples of the record.
+    """
+    n = len(y)
+    if points >= n or points < 3:
+        return x, y
+
+    # points - 2 buckets between the first and last samples, which are always kept
+    edges = np.linspace(1, n - 1, points - 1).astype(np.intp)
+    x_sums = np.concatenate(([0.0], np.cumsum(x, dtype=np.float64)))
+    y_sums = np.concatenate(([0.0], np.cumsum(y, dtype=np.float64)))
+    counts = np.diff(edges)
+    x_means = (x_sums[edges[1:]] - x_sums[edges[:-1]]) / counts
+    y_means = (y_sums[edges[1:]] - y_sums[edges[:-1]]) / counts
+    # the bucket after the last one is the last sample
+    x_means = np.append(x_means, x[-1])
+    y_means = np.append(y_means, y[-1])
+
+    idx = np.empty(points, np.intp)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs(
+            (x[a] - x_means[i + 1]) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (y_means[i + 1] - y[a])
+        )
+        a = lo + int(area.argmax())
+        idx[i + 1] = a
+    return x[idx], y[idx]
+
+
+class MinMaxPyramid:
+    """
+    Min/max envelopes of a record at several resolutions, so the visible part of a long
+    record can be drawn at any zoom level without scanning the whole record.
+
+    Level k holds the minimum and maximum of every `factor ** k` consecutive samples.
+    The pyramid takes about 2 / (factor - 1) times the memory of the record.
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, factor: int = 8, min_buckets: int = 1024):
+        """
+        Args:
+            x (np.ndarray): Sample times, in increasing order.
+            y (np.ndarray): Sample values.
+            factor (int, optional): Reduction between consecutive levels. Defaults to 8.
+            min_buckets (int, optional): Levels stop once one has at most this many buckets.
+                Defaults to 1024.
+        """
+        self.x = np.asarray(x)
+        self.y = np.asarray(y)
+        self.factor = factor
+        self.levels: list[tuple[np.ndarray, np.ndarray]] = []
+
+        mins = maxs = self.y
+        while len(mins) > min_buckets:
+            full = len(mins) // factor * factor
+            new_mins = mins[:full].reshape(-1, factor).min(axis=1)
+            new_maxs = maxs[:full].reshape(-1, factor).max(axis=1)
+            if full < len(mins):
+                new_mins = np.append(new_mins, mins[full:].min())
+                new_maxs = np.append(new_maxs, maxs[full:].max())
+            self.levels.append((new_mins, new_maxs))
+            mins, maxs = new_mins, new_maxs
+
+    @property
+    def nbytes(self) -> int:
+        return sum(mins.nbytes + maxs.nbytes for mins, maxs in self.levels)
+
+    def view(self, xmin: float, xmax: float, width: float) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the part of the record between xmin and xmax at the coarsest level that still
+        has at least one bucket per pixel.
+
+        Args:
+            xmin (float): Left edge of the view.
+            xmax (float): Right edge of the view.
+            width (float): Width of the view in pixels.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Points to draw. Each bucket is drawn as a vertical
+                segment from its minimum to its maximum.
+        """
+        n = len(self.y)
+        width = max(int(width), 1)
+        # include one sample beyond each edge so the line reaches the edges of the view
+        i0 = max(int(np.searchsorted(self.x, xmin)) - 1, 0)
+        i1 = min(int(np.searchsorted(self.x, xmax)) + 1, n)
+
+        level = 0
+        while level < len(self.levels) and (i1 - i0) // self.factor ** (level + 1) >= width:
+            level += 1
+        if level == 0:
+            return self.x[i0:i1], self.y[i0:i1]
+
+        size = self.factor ** level
+        mins, maxs = self.levels[level - 1]
+        j0, j1 = i0 // size, -(-i1 // size)
+        x = np.repeat(self.x[np.arange(j0, j1) * size], 2)
+        y = np.column_stack((mins[j0:j1], maxs[j0:j1])).ravel()
+        return x, y
+
+
+class SliceView:
+    """
+    Draws the visible part of a record after reducing it with a decimation function.
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, reduce=None):
+        """
+        Args:
+            x (np.ndarray): Sample times, in increasing order.
+            y (np.ndarray): Sample values.
+            reduce (optional): Called with the visible times, values and the width in pixels;
+                returns the points to draw. Defaults to drawing every visible point.
+        """
+        self.x = np.asarray(x)
+        self.y = np.asarray(y)
+        self.reduce = reduce
+        self.nbytes = 0
+
+    def view(self, xmin: float, xmax: float, width: float) -> tuple[np.ndarray, np.ndarray]:
+        i0 = max(int(np.searchsorted(self.x, xmin)) - 1, 0)
+        i1 = min(int(np.searchsorted(self.x, xmax)) + 1, len(self.y))
+        if self.reduce is None:
+            return self.x[i0:i1], self.y[i0:i1]
+        return self.reduce(self.x[i0:i1], self.y[i0:i1], max(int(width), 1))
+
+
+DECIMATION_METHODS = {
+    "min/max": lambda x, y: MinMaxPyramid(x, y),
+    "LTTB": lambda x, y: SliceView(x, y, lambda x, y, width: lttb(x, y, 2 * width)),
+    "off": lambda x, y: SliceView(x, y),
+}
+"""
+Decimation choices shown in the GUI. Each builds an object whose view(xmin, xmax, width)
+returns the points to draw for part of a record.
+"""
+
+
+def connect_zoom(ax, line, view) -> None:
+    """
+    Redraws a line with view() whenever the x limits of its axes or the size of its figure
+    change, so zooming and panning draw the visible part of the record at screen resolution.
+
+    Args:
+        ax (matplotlib.axes.Axes): The axes containing the line.
+        line (matplotlib.lines.Line2D): The line to update.
+        view: Called with the x limits and the width of the axes in pixels; returns the
+            points to draw.
+    """
+
+    def update(ax):
+        line.set_data(*view(*ax.get_xlim(), ax.get_window_extent().width))
+        ax.figure.canvas.draw_idle()
+
+    ax.callbacks.connect("xlim_changed", update)
+    ax.figure.canvas.mpl_connect("resize_event", lambda event: update(ax))
+
+
+def decimate(x, y, width: int, method: str = "min/max") -> tuple[np.ndarray, np.ndarray]:
+    """
+    Reduces a whole record to what can be seen in a plot `width` pixels wide.
+
+    Args:
+        x: Sample times.
+        y: Sample values.
+        width (int): Width of the plot in pixels.
+        method (str, optional): "min/max", "LTTB" or "off". Defaults to "min/max".
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The decimated times and values.
+    """
+    x, y = np.asarray(x), np.asarray(y)
+    width = max(int(width), 1)
+    if method == "min/max":
+        return minmax_envelope(x, y, width)
+    if method == "LTTB":
+        return lttb(x, y, 2 * width)
+    return x, y
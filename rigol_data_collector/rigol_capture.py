@@ -0,0 +1,122 @@
+"""
+Command line capture without the GUI, for scripts and cron jobs.
+
+Connects to the scope, saves data and/or a screenshot, and exits. Only the driver, NumPy
+and PyVISA are imported, so it starts much faster than main.py and doesn't need a display.
+Run with --help for usage.
+"""
+
+import argparse
+import os
+from datetime import datetime
+
+if __package__:
+    from . import util
+else:
+    # run as a script from the source tree, next to util.py
+    import util
+from Rigol1000z import Rigol1000z
+from Rigol1000z.constants import EWaveformMode
+from Rigol1000z.writers import writer_for_filename
+
+FORMATS = {"csv": ".csv", "parquet": ".parquet", "rigolraw": ".rigolraw", "npy": ".npy", "hdf5": ".h5"}
+MODES = {"norm": EWaveformMode.Normal, "raw": EWaveformMode.Raw}
+
+
+def parse_source(source: str) -> int:
+    """
+    Args:
+        source (str): A channel, e.g. "1", "CH1" or "CHAN1".
+
+    Returns:
+        int: The channel number.
+    """
+    number = source.upper().removeprefix("CHAN").removeprefix("CH")
+    if number not in {"1", "2", "3", "4"}:
+        raise argparse.ArgumentTypeError(f"invalid source: {source}")
+    return int(number)
+
+
+def output_path(template: str, extension: str, serial: str, time: datetime) -> str:
+    """
+    Fill in a file name template (see util.format_filename) and add the extension if the
+    name doesn't already have one.
+    """
+    path = util.format_filename(template, 1, serial, time)
+    return path if os.path.splitext(path)[1] else path + extension
+
+
+def main(args: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="data file to save; may use {timestamp}, {serial} and {time:...} "
+        "(the format comes from the extension, or --format if there is none)",
+    )
+    parser.add_argument("-f", "--format", choices=FORMATS, default="csv", help="data format if --output has no extension")
+    parser.add_argument("-m", "--mode", choices=MODES, default="norm", help="screen points (norm) or the whole memory (raw)")
+    parser.add_argument(
+        "-s",
+        "--source",
+        action="append",
+        dest="sources",
+        type=parse_source,
+        help="channel to save, e.g. 1 or CH1; repeatable (defaults to every enabled channel)",
+    )
+    parser.add_argument("--screenshot", help="screenshot file to save (.png, .jpg, .bmp or .tif); may use the same fields as --output")
+    parser.add_argument(
+        "-r",
+        "--resource",
+        help="VISA address of the scope (defaults to the last scope connected, or the first one found)",
+    )
+    parser.add_argument("--backend", default="", help="VISA backend for --resource, e.g. @py")
+    parser.add_argument("--run", action="store_true", help="set the scope running again afterwards")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only print errors")
+    options = parser.parse_args(args)
+
+    if options.output is None and options.screenshot is None:
+        parser.error("nothing to save; give --output and/or --screenshot")
+
+    if options.resource is not None:
+        osc = Rigol1000z(util.resource_pool.manager(options.backend).open_resource(options.resource))
+    else:
+        try:
+            _, _, osc = util.connect_scope()
+        except ConnectionError as e:
+            print(e)
+            return 1
+
+    with osc:
+        serial = osc._idn_cache.split(",")[2].strip()
+        # one time for both files, so their names match even if the download takes a while
+        now = datetime.now()
+
+        if options.output is not None:
+            if options.sources is not None:
+                disabled = [c for c in options.sources if not osc[c].enabled]
+                if disabled:
+                    print(f"Channel {disabled[0]} isn't enabled.")
+                    return 1
+            path = output_path(options.output, FORMATS[options.format], serial, now)
+            capture = osc.capture(
+                MODES[options.mode], writer_for_filename(path), channels=options.sources
+            )
+            if not options.quiet:
+                print(f"{path}: {capture.transfer}")
+
+        if options.screenshot is not None:
+            path = output_path(options.screenshot, ".png", serial, now)
+            # capture already stopped the scope; otherwise freeze the screen the same way
+            osc.stop()
+            osc.get_screenshot(path)
+            if not options.quiet:
+                print(path)
+
+        if options.run:
+            osc.run()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
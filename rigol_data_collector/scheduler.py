@@ -0,0 +1,405 @@
+"""
+Unattended captures on a fixed interval or on every trigger, for long-running tests.
+"""
+
+import os
+import queue
+import threading
+import time
+import tkinter as tk
+from datetime import datetime
+from tkinter import BooleanVar, StringVar, filedialog, messagebox, ttk
+from typing import Callable
+
+import util
+from pathcheck_so import is_path_exists_or_creatable
+from Rigol1000z.capture import Capture, write_capture
+from Rigol1000z.constants import ETriggerStatus, EWaveformMode
+from Rigol1000z.writers import writer_for_filename
+
+DEFAULT_TEMPLATE = "capture_{timestamp}_{counter:04d}"
+
+
+class SaveQueue:
+    """
+    Writes captures and screenshots on a background thread, so the next capture can be
+    downloaded while the previous one is still being written.
+    """
+
+    def __init__(self, maxsize: int = 4, on_saved: Callable | None = None):
+        """
+        Args:
+            maxsize (int, optional): Number of items that can wait to be written before put()
+                blocks, which bounds the memory held by the queue. Defaults to 4.
+            on_saved (Callable | None, optional): Called on the writer thread with the path
+                and the Capture or image bytes after each file is written.
+        """
+        self.on_saved = on_saved
+        self.errors = 0
+        self._queue = queue.Queue(maxsize)
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._closed = False
+        # a daemon, so the interpreter can still exit if close() is never called; close()
+        # waits for the queued files instead
+        self._thread = threading.Thread(target=self._write_files, name="save-queue", daemon=True)
+        self._thread.start()
+
+    @property
+    def backlog(self) -> int:
+        """
+        Number of files queued or being written.
+        """
+        return self._pending
+
+    def put(self, path: str, item: Capture | bytes) -> None:
+        """
+        Queue a file to be written. Blocks while the queue is full.
+
+        Args:
+            path (str): Path of the file. The format of a Capture is chosen from its extension.
+            item (Capture | bytes): The capture, or the screenshot image data.
+        """
+        with self._pending_lock:
+            self._pending += 1
+        self._queue.put((path, item))
+
+    def close(self, timeout: float | None = 30.0) -> None:
+        """
+        Stop the writer thread once the queued files have been written, and wait for it.
+        Does nothing if already closed.
+
+        Args:
+            timeout (float | None, optional): Longest time to wait in seconds. Files that
+                haven't been written by then are lost when the interpreter exits.
+                Defaults to 30.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _write_files(self) -> None:
+        while (entry := self._queue.get()) is not None:
+            path, item = entry
+            try:
+                if isinstance(item, Capture):
+                    write_capture(item, writer_for_filename(path))
+                else:
+                    with open(path, "wb") as f:
+                        f.write(item)
+                if self.on_saved is not None:
+                    self.on_saved(path, item)
+            except Exception as e:
+                self.errors += 1
+                print(f"Couldn't save {path}: {e}")
+            finally:
+                with self._pending_lock:
+                    self._pending -= 1
+
+
+class SchedulerPanel(ttk.LabelFrame):
+    """
+    LabelFrame for running data and/or screenshot captures unattended, either every N
+    seconds or every time the scope triggers.
+
+    Captures run on a background thread and files are written by a SaveQueue, so nothing
+    depends on the Tk event loop and the schedule keeps running while the window isn't
+    focused or is minimized.
+    """
+
+    def __init__(
+        self,
+        parent,
+        get_scope: Callable,
+        scope_lock: threading.RLock,
+        data_extensions: tuple[str, ...],
+        on_saved: Callable | None = None,
+        **kwargs,
+    ):
+        """
+        Args:
+            parent: Parent widget.
+            get_scope (Callable): Returns the connected Rigol1000z, or None.
+            scope_lock (threading.RLock): Held during each capture, so other scope I/O
+                can't be interleaved with it.
+            data_extensions (tuple[str, ...]): Data file formats to choose from.
+            on_saved (Callable | None, optional): Called on the writer thread with the path
+                and the Capture or image bytes of each saved file.
+        """
+        ttk.LabelFrame.__init__(self, parent, text="Scheduled Captures", **kwargs)
+        self.get_scope = get_scope
+        self.scope_lock = scope_lock
+        self.save_queue = SaveQueue(on_saved=on_saved)
+
+        self.directory = StringVar()
+        self.template = StringVar(value=DEFAULT_TEMPLATE)
+        self.save_data = BooleanVar(value=True)
+        self.data_extension = StringVar(value=data_extensions[0])
+        self.data_mode = StringVar(value=EWaveformMode.Normal)
+        self.save_screenshot = BooleanVar(value=False)
+        self.schedule = StringVar(value="interval")
+        self.interval = StringVar(value="10")
+        self.status = StringVar(value="Stopped.")
+
+        self._thread = None
+        self._stop = threading.Event()
+        self._stop.set()
+        # settings and counter of the last run, so it can be resumed
+        self._settings = None
+        self._counter = 0
+        # written by the capture thread, read by the status updates
+        self._captures = 0
+        self._missed = 0
+        self._started = 0.0
+        self._error = None
+        # time.monotonic() of the error that stopped the captures; cleared by the Stop button
+        self._failed_at = None
+
+        ttk.Label(self, text="Directory:").grid(column=0, row=0, sticky=tk.W)
+        ttk.Entry(self, width=30, textvariable=self.directory).grid(column=1, row=0, columnspan=3, sticky=tk.EW)
+        ttk.Button(self, text="...", command=self.browse_directory).grid(column=4, row=0)
+
+        ttk.Label(self, text="Name template:").grid(column=0, row=1, sticky=tk.W)
+        ttk.Entry(self, width=30, textvariable=self.template).grid(column=1, row=1, columnspan=3, sticky=tk.EW)
+
+        ttk.Checkbutton(self, text="Data", variable=self.save_data).grid(column=0, row=2, sticky=tk.W)
+        ttk.Combobox(
+            self, textvariable=self.data_extension, values=data_extensions, state="readonly", width=9
+        ).grid(column=1, row=2, sticky=tk.W)
+        ttk.Combobox(
+            self,
+            textvariable=self.data_mode,
+            values=[EWaveformMode.Normal, EWaveformMode.Raw],
+            state="readonly",
+            width=5,
+        ).grid(column=2, row=2, sticky=tk.W)
+        ttk.Checkbutton(self, text="Screenshot", variable=self.save_screenshot).grid(column=3, row=2, sticky=tk.W)
+
+        ttk.Radiobutton(self, text="Every", variable=self.schedule, value="interval").grid(column=0, row=3, sticky=tk.W)
+        ttk.Entry(self, width=8, textvariable=self.interval).grid(column=1, row=3, sticky=tk.W)
+        ttk.Label(self, text="seconds").grid(column=2, row=3, sticky=tk.W)
+        ttk.Radiobutton(self, text="On every trigger", variable=self.schedule, value="trigger").grid(
+            column=3, row=3, columnspan=2, sticky=tk.W
+        )
+
+        ttk.Button(self, text="Start", command=self.start).grid(column=0, row=4, sticky=tk.EW)
+        ttk.Button(self, text="Stop", command=self.stop).grid(column=1, row=4, sticky=tk.EW)
+        ttk.Label(self, textvariable=self.status).grid(column=2, row=4, columnspan=3, sticky=tk.W, padx=10)
+
+    def browse_directory(self) -> None:
+        path = filedialog.askdirectory(title="Select capture location", mustexist=True)
+        if path != "":
+            self.directory.set(path)
+
+    def start(self) -> None:
+        """
+        Checks the settings and starts capturing, if the scope is connected.
+        """
+        if not self._stop.is_set():
+            return
+        scope = self.get_scope()
+        if scope is None:
+            self.status.set("Scope not connected.")
+            return
+        if not (self.save_data.get() or self.save_screenshot.get()):
+            messagebox.showwarning(message="Select data and/or screenshots to capture.")
+            return
+        if not is_path_exists_or_creatable(self.directory.get()):
+            messagebox.showwarning(message="Chosen file path is invalid or inaccessible.")
+            return
+        try:
+            util.format_filename(self.template.get(), 1, "")
+        except (KeyError, IndexError, ValueError) as e:
+            messagebox.showwarning(message=f"Invalid name template: {e}")
+            return
+        try:
+            interval = float(self.interval.get())
+        except ValueError:
+            interval = 0.0
+        on_trigger = self.schedule.get() == "trigger"
+        if not on_trigger and interval <= 0:
+            messagebox.showwarning(message="The interval must be a positive number of seconds.")
+            return
+
+        settings = {
+            "directory": self.directory.get(),
+            "template": self.template.get(),
+            "serial": scope._idn_cache.split(",")[2].strip(),
+            "data_extension": self.data_extension.get() if self.save_data.get() else None,
+            "data_mode": self.data_mode.get(),
+            "screenshot": self.save_screenshot.get(),
+            "interval": None if on_trigger else interval,
+        }
+        os.makedirs(settings["directory"], exist_ok=True)
+
+        self._settings = settings
+        self._counter = 0
+        self._captures = self._missed = 0
+        self._started = time.monotonic()
+        self._start_thread()
+
+    def resume(self, since: float) -> None:
+        """
+        Restarts captures that stopped because of an error since `since`, e.g. once the scope
+        has been reconnected after the connection was lost at that time. The file counter and
+        statistics carry on from where they stopped. Does nothing if the captures are running,
+        were stopped with the Stop button, or failed before `since`.
+
+        Args:
+            since (float): time.monotonic() of the last time the scope was known to work.
+        """
+        if (
+            self._stop.is_set()
+            and self._failed_at is not None
+            and self._failed_at >= since
+            and self._settings is not None
+        ):
+            self._start_thread()
+
+    def _start_thread(self) -> None:
+        self._error = None
+        self._failed_at = None
+        # each capture thread gets its own flag, so a thread that is still finishing its
+        # last capture after stop() can't be revived by a quick restart
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(self._stop, self._settings), daemon=True)
+        self._thread.start()
+        self.after(0, self._update_status)
+
+    def stop(self) -> None:
+        """
+        Stops capturing after the current capture. Queued files are still written.
+        """
+        self._stop.set()
+        self._failed_at = None
+
+    def close(self) -> None:
+        """
+        Stops capturing and waits for the save queue to write the queued files.
+        """
+        self.stop()
+        self.save_queue.close()
+
+    def _run(self, stop: threading.Event, settings: dict) -> None:
+        """
+        Runs on the capture thread until stopped or a capture fails.
+        """
+        interval = settings["interval"]
+        next_time = time.monotonic()
+        try:
+            while not stop.is_set():
+                if interval is None:
+                    if not self._wait_for_trigger(stop):
+                        return
+                elif stop.wait(max(0.0, next_time - time.monotonic())):
+                    return
+
+                # one time for the check and the names, so the files that were checked for are
+                # the ones written even if a second boundary passes in between
+                self._counter, paths = self._next_counter(self._counter, settings, datetime.now())
+                self._capture(paths, settings)
+                self._captures += 1
+
+                if interval is not None:
+                    # keep to the original schedule; slots that have already passed are skipped
+                    next_time += interval
+                    late = time.monotonic() - next_time
+                    if late > 0:
+                        skipped = int(late // interval) + 1
+                        self._missed += skipped
+                        next_time += skipped * interval
+        except Exception as e:
+            self._error = e
+            self._failed_at = time.monotonic()
+        finally:
+            stop.set()
+
+    def _wait_for_trigger(self, stop: threading.Event) -> bool:
+        """
+        Arms a single acquisition and waits for it to complete.
+
+        Returns:
+            bool: True once the scope has triggered, False if stopped first.
+        """
+        with self.scope_lock:
+            scope = self._scope()
+            scope.set_single_shot()
+            # make sure the scope has armed before polling, so the status isn't left over from
+            # the previous acquisition
+            scope.ieee488.operation_complete
+        # the scope stops once the single acquisition has triggered
+        while not stop.wait(0.05):
+            with self.scope_lock:
+                if self._scope().trigger.status == ETriggerStatus.Stop:
+                    return True
+        return False
+
+    def _next_counter(self, counter: int, settings: dict, time: datetime) -> tuple[int, list[str]]:
+        """
+        Returns the next counter value whose files don't exist yet, so a restarted schedule
+        doesn't overwrite the files of a previous run, and the paths of those files. If the
+        template doesn't use the counter, existing files are overwritten.
+        """
+        counter += 1
+        paths = self._paths(counter, settings, time)
+        if "{counter" not in settings["template"]:
+            return counter, paths
+        while any(os.path.exists(path) for path in paths):
+            counter += 1
+            paths = self._paths(counter, settings, time)
+        return counter, paths
+
+    def _paths(self, counter: int, settings: dict, time: datetime) -> list[str]:
+        base = os.path.join(
+            settings["directory"], util.format_filename(settings["template"], counter, settings["serial"], time)
+        )
+        paths = []
+        if settings["data_extension"] is not None:
+            paths.append(base + settings["data_extension"])
+        if settings["screenshot"]:
+            paths.append(base + ".png")
+        return paths
+
+    def _capture(self, paths: list[str], settings: dict) -> None:
+        """
+        Downloads the data and/or screenshot and queues them to be written to `paths`
+        (see _paths).
+        """
+        items = []
+        with self.scope_lock:
+            scope = self._scope()
+            if settings["data_extension"] is not None:
+                items.append(scope.capture(settings["data_mode"]))
+            if settings["screenshot"]:
+                items.append(scope.get_screenshot())
+            if settings["interval"] is not None:
+                # capture stops the scope; keep acquiring until the next capture
+                scope.run()
+        for path, item in zip(paths, items):
+            self.save_queue.put(path, item)
+
+    def _scope(self):
+        scope = self.get_scope()
+        if scope is None:
+            raise ConnectionError("Scope not connected.")
+        return scope
+
+    def _update_status(self) -> None:
+        """
+        Runs on the Tk thread while capturing; shows the achieved rate and the backlog.
+        """
+        elapsed = time.monotonic() - self._started
+        rate = self._captures / elapsed * 60 if elapsed > 0 else 0.0
+        status = (
+            f"{self._captures} captures ({rate:.1f}/min), {self._missed} missed, "
+            f"backlog {self.save_queue.backlog}"
+        )
+        if self.save_queue.errors:
+            status += f", {self.save_queue.errors} failed writes"
+        if self._stop.is_set():
+            status = f"Stopped: {self._error}" if self._error is not None else f"Stopped. {status}"
+        else:
+            self.after(500, self._update_status)
+        self.status.set(status)
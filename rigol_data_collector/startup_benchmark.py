@@ -0,0 +1,99 @@
+"""
+Benchmark of the GUI's cold start, with a time budget.
+
+Each run starts a new interpreter that imports main, creates the window and processes its
+first events, and reports how long that took. The benchmark fails if the median exceeds the
+budget, or if any of main.DEFERRED_MODULES were imported before the window was shown.
+Run with --help for usage.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# run in a fresh interpreter for every measurement, so nothing is already imported or cached
+CHILD = """
+import json, os, sys, time
+started = time.perf_counter()
+import tkinter as tk
+import main
+imported = time.perf_counter()
+if {window}:
+    root = tk.Tk()
+    app = main.MainApplication(root)
+    app.grid(row=0, column=0, sticky=tk.NSEW)
+    root.update()
+shown = time.perf_counter()
+print(json.dumps({{
+    "import": imported - started,
+    "window": shown - started,
+    "deferred": [name for name in main.DEFERRED_MODULES if name in sys.modules],
+}}))
+sys.stdout.flush()
+# skip tearing down the window and the background threads
+os._exit(0)
+"""
+
+
+def measure(window: bool) -> dict:
+    """
+    Start the GUI once in a new interpreter.
+
+    Args:
+        window (bool): Create the window, rather than only importing main.
+
+    Returns:
+        dict: "import" and "window" times in seconds (from the start of the interpreter's
+            imports), "total" time of the process including interpreter startup, and the
+            "deferred" modules that were imported anyway.
+    """
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD.format(window=window)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = json.loads(result.stdout.strip().splitlines()[-1])
+    times["total"] = time.perf_counter() - started
+    return times
+
+
+def main(args: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", "--runs", type=int, default=5, help="number of cold starts")
+    parser.add_argument("-b", "--budget", type=float, default=0.5, help="budget for the median in seconds")
+    parser.add_argument(
+        "--imports-only", action="store_true", help="only import main (e.g. when there's no display)"
+    )
+    options = parser.parse_args(args)
+
+    try:
+        runs = [measure(not options.imports_only) for _ in range(options.runs)]
+    except subprocess.CalledProcessError as e:
+        print(f"The GUI failed to start: {e.stderr.strip().splitlines()[-1]}")
+        return 1
+    key = "import" if options.imports_only else "window"
+    median = statistics.median(run[key] for run in runs)
+    names = ("import", "total") if options.imports_only else ("import", "window", "total")
+    for name in names:
+        print(f"{name:>6}: median {statistics.median(run[name] for run in runs):.3f} s")
+
+    failed = False
+    if median > options.budget:
+        print(f"Over budget: {median:.3f} s > {options.budget:.3f} s")
+        failed = True
+    deferred = sorted({name for run in runs for name in run["deferred"]})
+    if deferred:
+        print(f"Imported before the window was shown: {', '.join(deferred)}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,175 @@
+"""
+Watches the scope connection and reconnects after USB glitches or replugging.
+"""
+
+import threading
+import time
+from typing import Callable
+
+import util
+from Rigol1000z import Rigol1000z
+
+
+class ConnectionSupervisor:
+    """
+    Sends a cheap heartbeat query ("*OPC?") to the watched scope every few seconds. When it
+    fails, the same scope is reopened with increasing delays between attempts (on the same
+    address, or on another one it was connected on before), and the waveform read settings
+    of the old connection are restored.
+
+    Runs on its own thread; the callbacks are called from that thread.
+    """
+
+    def __init__(
+        self,
+        scope_lock: threading.RLock,
+        on_lost: Callable[[Exception], None],
+        on_reconnected: Callable[[str, str, Rigol1000z, float], None],
+        interval: float = 2.0,
+        timeout: int = 1000,
+        max_backoff: float = 30.0,
+    ):
+        """
+        Args:
+            scope_lock (threading.RLock): Held for the heartbeat and while reconnecting. The
+                heartbeat is skipped while anything else holds it, since a transfer that's
+                in progress already shows whether the connection works.
+            on_lost (Callable[[Exception], None]): Called with the error when the heartbeat fails.
+            on_reconnected (Callable[[str, str, Rigol1000z, float], None]): Called with the VISA
+                address, backend and new Rigol1000z after reconnecting, while scope_lock is still
+                held, and the time.monotonic() of the last heartbeat before the connection was
+                lost, so errors since then can be told apart from earlier ones.
+            interval (float, optional): Time between heartbeats in seconds. Defaults to 2.
+            timeout (int, optional): Timeout of the heartbeat query in milliseconds.
+                Defaults to 1000.
+            max_backoff (float, optional): Longest delay between reconnect attempts in seconds.
+                The delay starts at 1 s and doubles after each failed attempt. Defaults to 30.
+        """
+        self.scope_lock = scope_lock
+        self.on_lost = on_lost
+        self.on_reconnected = on_reconnected
+        self.interval = interval
+        self.timeout = timeout
+        self.max_backoff = max_backoff
+
+        # (visa_name, visa_backend, osc) of the watched scope, or None
+        self._watched = None
+        # time.monotonic() of the last time the watched scope answered
+        self._alive_at = time.monotonic()
+        self._watched_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="connection-supervisor", daemon=True)
+        self._thread.start()
+
+    def watch(self, visa_name: str, visa_backend: str, osc: Rigol1000z) -> None:
+        """
+        Start watching a newly connected scope.
+        """
+        with self._watched_lock:
+            self._watched = (visa_name, visa_backend, osc)
+            self._alive_at = time.monotonic()
+
+    def unwatch(self) -> None:
+        """
+        Stop watching, e.g. because the scope is being disconnected on purpose. Stops any
+        reconnect attempts.
+        """
+        with self._watched_lock:
+            self._watched = None
+
+    def stop(self) -> None:
+        self.unwatch()
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            watched = self._watched
+            if watched is None or not self.scope_lock.acquire(blocking=False):
+                continue
+            try:
+                self._heartbeat(watched[2])
+                self._alive_at = time.monotonic()
+                continue
+            except Exception as e:
+                error = e
+            finally:
+                self.scope_lock.release()
+
+            if watched is self._watched:
+                self.on_lost(error)
+                self._reconnect(watched, self._alive_at)
+
+    def _heartbeat(self, osc: Rigol1000z) -> None:
+        old_timeout = osc.visa_resource.timeout
+        osc.visa_resource.timeout = self.timeout
+        try:
+            osc.ieee488.operation_complete
+        finally:
+            osc.visa_resource.timeout = old_timeout
+
+    def _reconnect(self, watched: tuple, lost_since: float) -> None:
+        """
+        Retries until reconnected, stopped, or a different scope is watched.
+        """
+        visa_name, visa_backend, old_osc = watched
+        idn = old_osc._idn_cache.strip()
+        serial = (idn.split(",") + ["", "", ""])[2]
+        delay = 1.0
+        while watched is self._watched:
+            with self.scope_lock:
+                try:
+                    old_osc.visa_resource.close()
+                except Exception:
+                    pass
+                found = self._open_same_scope(visa_name, visa_backend, idn, serial)
+                if found is not None:
+                    name, backend, osc = found
+                    try:
+                        osc.waveform.restore_read_settings(old_osc.waveform.read_settings)
+                    except Exception:
+                        osc.visa_resource.close()
+                        found = None
+
+                if found is not None:
+                    with self._watched_lock:
+                        if watched is not self._watched:
+                            # disconnected on purpose while reconnecting
+                            osc.visa_resource.close()
+                            return
+                        self._watched = (name, backend, osc)
+                        self._alive_at = time.monotonic()
+                    util.remember_scope(name, backend, osc._idn_cache)
+                    # still holding the scope lock, so other threads can't use the old scope
+                    # between reconnecting and the callback
+                    self.on_reconnected(name, backend, osc, lost_since)
+                    return
+
+            if self._stop.wait(delay):
+                return
+            delay = min(delay * 2, self.max_backoff)
+
+    @staticmethod
+    def _open_same_scope(visa_name: str, visa_backend: str, idn: str, serial: str) -> tuple | None:
+        """
+        Tries the address the scope was lost on, then the known scopes with the same IDN or
+        serial number (it may come back on a different address after replugging). Scopes that
+        answer with a different serial number are closed again, so only the scope that was lost
+        is reconnected, never another one.
+
+        Returns:
+            tuple | None: (visa_name, visa_backend, osc) of the reopened scope, or None.
+        """
+        candidates = [(visa_name, visa_backend)] + [
+            (scope["resource"], scope["backend"])
+            for scope in util.known_scopes()
+            if scope.get("idn") == idn or (serial and scope.get("serial") == serial)
+        ]
+        # dict.fromkeys drops duplicates but keeps the order
+        for name, backend in dict.fromkeys(candidates):
+            osc = util._open_rigol(name, backend)
+            if osc is None:
+                continue
+            if (osc._idn_cache.strip().split(",") + ["", "", ""])[2] == serial:
+                return name, backend, osc
+            osc.visa_resource.close()
+        return None
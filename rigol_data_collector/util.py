@@ -1,53 +1,398 @@
+import json
+import os
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
 
 from pyvisa import ResourceManager
 from pyvisa.errors import LibraryError, VisaIOError
+from pyvisa.resources import Resource
 
-def find_visas() -> list[tuple]:
+from Rigol1000z import Rigol1000z
+
+# resource classes that can't be a DS1000Z; probing serial ports can take seconds each
+NON_SCOPE_RESOURCE_CLASSES = ("ASRL", "GPIB")
+
+class ResourcePool:
+    '''
+    Keeps one ResourceManager per VISA backend for the whole process, and the scope sessions
+    that find_visas opened, so that connecting right after a search reuses them instead of
+    loading the VISA library and opening the resource again.
+
+    A session that isn't taken within max_idle seconds is closed, so the pool never holds
+    on to a scope that another program may want to open.
+    '''
+
+    def __init__(self, max_idle: float = 30.0, retry_after: float = 10.0):
+        '''
+        Args:
+            max_idle (float, optional): Time in seconds an unused session is kept open.
+                Defaults to 30.
+            retry_after (float, optional): Time in seconds the error of a backend that
+                couldn't be loaded is kept before trying to load it again, so a VISA library
+                installed while the app is running is found. Defaults to 10.
+        '''
+        self.max_idle = max_idle
+        self.retry_after = retry_after
+        # backend -> ResourceManager, or (the exception raised when creating it, when)
+        self._managers = {}
+        # (visa_name, visa_backend) -> (session, time it was released)
+        self._idle = {}
+        # closes the idle sessions when the oldest one expires; one at a time
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def manager(self, visa_backend: str) -> ResourceManager:
+        '''
+        Returns the ResourceManager of a backend, creating it the first time.
+
+        Raises:
+            The error of creating the ResourceManager (e.g. LibraryError if the backend isn't
+            installed). It's raised again on calls within retry_after seconds without retrying.
+        '''
+        with self._lock:
+            manager = self._managers.get(visa_backend)
+            failed = isinstance(manager, tuple)
+            if manager is None or failed and time.monotonic() - manager[1] >= self.retry_after:
+                try:
+                    manager = ResourceManager(visa_backend)
+                except Exception as e:
+                    manager = (e, time.monotonic())
+                self._managers[visa_backend] = manager
+        if isinstance(manager, tuple):
+            raise manager[0]
+        return manager
+
+    def take(self, visa_name: str, visa_backend: str) -> Resource | None:
+        '''
+        Returns the idle session of a resource and removes it from the pool, or None if
+        there isn't one. The session may have gone stale since it was released.
+        '''
+        with self._lock:
+            entry = self._idle.pop((visa_name, visa_backend), None)
+        return None if entry is None else entry[0]
+
+    def release(self, visa_name: str, visa_backend: str, visa_resource: Resource) -> None:
+        '''
+        Keeps an open session for up to max_idle seconds instead of closing it.
+        '''
+        with self._lock:
+            old = self._idle.pop((visa_name, visa_backend), None)
+            self._idle[(visa_name, visa_backend)] = (visa_resource, time.monotonic())
+            self._schedule_close()
+        if old is not None and old[0] is not visa_resource:
+            _close_quietly(old[0])
+
+    def close_idle(self, max_idle: float = 0.0) -> None:
+        '''
+        Closes the sessions that have been idle for at least max_idle seconds.
+
+        Args:
+            max_idle (float, optional): Defaults to 0 (close all of them).
+        '''
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, (_, released) in self._idle.items() if now - released >= max_idle]
+            sessions = [self._idle.pop(key)[0] for key in expired]
+        for visa_resource in sessions:
+            _close_quietly(visa_resource)
+
+    def _close_expired(self) -> None:
+        self.close_idle(self.max_idle)
+        with self._lock:
+            self._schedule_close()
+
+    def _schedule_close(self) -> None:
+        '''
+        Replaces the timer with one for the oldest idle session. Called with _lock held.
+        '''
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._idle:
+            return
+        oldest = min(released for _, released in self._idle.values())
+        delay = max(0.0, oldest + self.max_idle - time.monotonic())
+        self._timer = threading.Timer(delay, self._close_expired)
+        self._timer.daemon = True
+        self._timer.start()
+
+def _close_quietly(visa_resource: Resource) -> None:
+    try:
+        visa_resource.close()
+    except Exception:
+        pass
+
+# shared by everything in the process that opens a VISA resource
+resource_pool = ResourcePool()
+
+def find_visas(
+    backends: tuple[str, ...] = ("@ivi", "@py"),
+    skip_classes: tuple[str, ...] = NON_SCOPE_RESOURCE_CLASSES,
+    first: bool = False,
+    timeout: int = 1000,
+    max_workers: int = 8,
+) -> list[tuple]:
     '''
     Return all VISA addresses (and the backend) which map to a Rigol DS1000Z.
 
+    Resources are probed with "*IDN?" concurrently, each with a short timeout. The sessions
+    of the scopes found are left open in resource_pool for a while, so connecting to one of
+    them right away doesn't open it again.
+
+    Args:
+        backends (tuple[str, ...], optional): VISA backends to search. Defaults to
+            ("@ivi", "@py").
+        skip_classes (tuple[str, ...], optional): Resource name prefixes that aren't probed.
+            Defaults to NON_SCOPE_RESOURCE_CLASSES (serial and GPIB); pass () to probe
+            everything.
+        first (bool, optional): Return as soon as one scope is found. Defaults to False.
+        timeout (int, optional): Open and query timeout for each resource in milliseconds.
+            Defaults to 1000.
+        max_workers (int, optional): Number of resources probed at once. Defaults to 8.
+
     Returns:
-        list[tuple]: A list of VISA addresses and backends mapping to Rigol DS1000Zs.
+        list[tuple]: A list of VISA addresses and backends mapping to Rigol DS1000Zs, in the
+            order they were listed (or only the first one found, if first is True).
     '''
-    RIGOL_IDN_REGEX = "^RIGOL TECHNOLOGIES,DS1[01][057]4Z(-S)?( Plus)?,.+$"
+    candidates = []
+    for visa_backend in backends:
+        try:
+            visa_manager = resource_pool.manager(visa_backend)
+            visa_names = visa_manager.list_resources()
+        except (LibraryError, OSError, ValueError, VisaIOError):
+            continue
+        candidates += [
+            (visa_manager, visa_name, visa_backend)
+            for visa_name in visa_names
+            if not visa_name.upper().startswith(skip_classes)
+        ]
 
     visas = []
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {
+            executor.submit(_is_rigol, visa_manager, visa_name, visa_backend, timeout): (i, visa_name, visa_backend)
+            for i, (visa_manager, visa_name, visa_backend) in enumerate(candidates)
+        }
+        for future in as_completed(futures):
+            if future.result():
+                visas.append(futures[future])
+                if first:
+                    break
+    finally:
+        # probes that are still running after the first match finish in the background
+        executor.shutdown(wait=not first, cancel_futures=True)
 
-    for visa_backend in ["@ivi", "@py"]:
-        try:
-            visa_manager = ResourceManager(visa_backend)
-        except LibraryError:
-            pass
-        except OSError:
-            pass
-
-        for visa_name in visa_manager.list_resources():
-            try:
-                visa_resource = visa_manager.open_resource(visa_name)
-                match = re.search(RIGOL_IDN_REGEX, visa_resource.query("*IDN?"))    # type:ignore
-                if match:
-                    visas.append((visa_name, visa_backend))
-            except VisaIOError:
-                pass
-            finally:
-                visa_resource.close()
-
-    return visas
-
-def add_extension_if_needed(path: str, extension: str) -> str:
+    return [(visa_name, visa_backend) for _, visa_name, visa_backend in sorted(visas)]
+
+def _is_rigol(visa_manager: ResourceManager, visa_name: str, visa_backend: str, timeout: int) -> bool:
+    '''
+    Returns true if the resource answers "*IDN?" as a Rigol DS1000Z. Any error means it isn't one.
+    The session of a scope is released to resource_pool, any other one is closed.
+    '''
+    RIGOL_IDN_REGEX = "^RIGOL TECHNOLOGIES,DS1[01][057]4Z(-S)?( Plus)?,.+$"
+
+    visa_resource = resource_pool.take(visa_name, visa_backend)
+    try:
+        if visa_resource is None:
+            visa_resource = visa_manager.open_resource(visa_name, open_timeout=timeout)
+    except Exception:
+        return False
+    try:
+        old_timeout = visa_resource.timeout
+        visa_resource.timeout = timeout
+        is_rigol = re.search(RIGOL_IDN_REGEX, visa_resource.query("*IDN?")) is not None  # type:ignore
+        visa_resource.timeout = old_timeout
+    except Exception:
+        is_rigol = False
+    if is_rigol:
+        resource_pool.release(visa_name, visa_backend, visa_resource)
+    else:
+        _close_quietly(visa_resource)
+    return is_rigol
+
+def connect_scope(visa_name: str = "", visa_backend: str = "") -> tuple[str, str, Rigol1000z]:
+    '''
+    Opens a scope. The given address is tried first, then the scopes that were connected
+    before (most recent first, see known_scopes), and only if none of them answer is
+    find_visas used to search for one. Opening a known scope costs one "*IDN?" query.
+    The opened scope is remembered for next time.
+
+    Args:
+        visa_name (str, optional): VISA address to try first. Defaults to "" (none).
+        visa_backend (str, optional): VISA backend of visa_name. Defaults to "".
+
+    Raises:
+        ConnectionError: If no scope could be opened.
+
+    Returns:
+        tuple[str, str, Rigol1000z]: The VISA address, backend and the opened scope.
+    '''
+    candidates = [(visa_name, visa_backend)] if visa_name else []
+    candidates += [(scope["resource"], scope["backend"]) for scope in known_scopes()]
+    # dict.fromkeys drops duplicates but keeps the order
+    for visa_name, visa_backend in dict.fromkeys(candidates):
+        osc = _open_rigol(visa_name, visa_backend)
+        if osc is not None:
+            break
+    else:
+        visas = find_visas(first=True)
+        osc = _open_rigol(*visas[0]) if visas else None
+        if osc is None:
+            raise ConnectionError("No scope found.")
+        visa_name, visa_backend = visas[0]
+
+    remember_scope(visa_name, visa_backend, osc._idn_cache)
+    return visa_name, visa_backend, osc
+
+def _open_rigol(visa_name: str, visa_backend: str, timeout: int = 2000) -> Rigol1000z | None:
+    '''
+    Returns the opened scope, or None if the address can't be opened or isn't a DS1000Z.
+    A session left open by find_visas is used if there is one and it still answers.
+    '''
+    visa_resource = resource_pool.take(visa_name, visa_backend)
+    if visa_resource is not None:
+        osc = _rigol_or_none(visa_resource)
+        if osc is not None:
+            return osc
+    try:
+        visa_resource = resource_pool.manager(visa_backend).open_resource(visa_name, open_timeout=timeout)
+    except Exception:
+        return None
+    return _rigol_or_none(visa_resource)
+
+def _rigol_or_none(visa_resource: Resource) -> Rigol1000z | None:
+    '''
+    Returns the scope on an open session, or None (closing the session) if it isn't a DS1000Z.
+    '''
+    try:
+        return Rigol1000z(visa_resource)
+    except Exception:
+        _close_quietly(visa_resource)
+        return None
+
+def known_scopes_path() -> str:
+    '''
+    Returns:
+        str: Path of the file that remembers the scopes that were connected before.
+    '''
+    return os.path.join(app_data_dir(), "scopes.json")
+
+def known_scopes() -> list[dict]:
+    '''
+    Returns the scopes that were connected before, most recently connected first.
+
+    Returns:
+        list[dict]: Each has the "resource" (VISA address), "backend", "idn", "serial" and
+            "last_connected" (ISO time) of a scope. Empty if there's no readable cache.
+    '''
+    try:
+        with open(known_scopes_path()) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+def remember_scope(visa_name: str, visa_backend: str, idn: str, max_scopes: int = 10) -> None:
+    '''
+    Moves a scope to the front of the known scopes, adding it if needed.
+
+    Args:
+        visa_name (str): VISA address of the scope.
+        visa_backend (str): VISA backend the address was opened with.
+        idn (str): The scope's "*IDN?" response.
+        max_scopes (int, optional): Number of scopes to remember. Defaults to 10.
+    '''
+    idn = idn.strip()
+    scopes = [
+        scope
+        for scope in known_scopes()
+        if (scope["resource"], scope["backend"]) != (visa_name, visa_backend)
+    ]
+    scopes.insert(0, {
+        "resource": visa_name,
+        "backend": visa_backend,
+        "idn": idn,
+        "serial": (idn.split(",") + ["", "", ""])[2],
+        "last_connected": datetime.now().astimezone().isoformat(),
+    })
+    # written to a partial file first, so an interrupted write can't corrupt the cache
+    path = known_scopes_path()
+    try:
+        with open(partial_path(path), "w") as f:
+            json.dump(scopes[:max_scopes], f, indent=2)
+        os.replace(partial_path(path), path)
+    except OSError as e:
+        print(f"Couldn't remember the scope: {e}")
+
+def add_extension_if_needed(path: str, extension: str | tuple[str, ...]) -> str:
     '''
     Adds a file extension to a path if the path doesn't already have that
     extension.
 
     Args:
         path (str): A file path.
-        extension (str): A file extension. Must begin with "." (e.g. ".csv", not "csv").
+        extension (str | tuple[str, ...]): A file extension. Must begin with "."
+            (e.g. ".csv", not "csv"). If a tuple of extensions is given, the path is
+            left alone if it has any of them, otherwise the first one is added.
 
     Returns:
         str: The supplied path with the supplied file extension.
     '''
     if path.endswith(extension):
         return path
+    elif isinstance(extension, tuple):
+        return path + extension[0]
     else:
         return path + extension
+
+def app_data_dir() -> str:
+    '''
+    Returns the directory where the app keeps its own files (e.g. the capture
+    catalog), creating it if needed.
+
+    Returns:
+        str: Path of the directory.
+    '''
+    path = os.path.join(os.path.expanduser("~"), ".rigol-data-collector")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def format_filename(template: str, counter: int, serial: str, time: datetime | None = None) -> str:
+    '''
+    Fills in a file name template.
+
+    The template is a str.format string that can use {timestamp} (e.g. 20240301-153000),
+    {counter} (1 for the first capture of a run, e.g. {counter:04d}), {serial} (the scope's
+    serial number) and {time} (a datetime, e.g. {time:%H-%M-%S}).
+
+    Args:
+        template (str): The template.
+        counter (int): Number of the capture.
+        serial (str): Serial number of the scope.
+        time (datetime | None, optional): Time of the capture. Defaults to now.
+
+    Returns:
+        str: The file name, without an extension.
+    '''
+    time = time or datetime.now()
+    return template.format(
+        timestamp=time.strftime("%Y%m%d-%H%M%S"), counter=counter, serial=serial, time=time
+    )
+
+def partial_path(path: str) -> str:
+    '''
+    Returns a hidden temporary path next to a file, with the same extension, to write the
+    file to before renaming it into place once it's complete.
+
+    Args:
+        path (str): Final path of the file.
+
+    Returns:
+        str: The temporary path.
+    '''
+    directory, name = os.path.split(path)
+    stem, extension = os.path.splitext(name)
+    return os.path.join(directory, f".{stem}.partial{extension}")
@@ -0,0 +1,124 @@
+"""
+Background thread for scope I/O, so long transfers don't freeze the Tk window.
+"""
+
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+from Rigol1000z import CaptureCancelled
+
+
+class ScopeWorker:
+    """
+    Runs scope jobs one at a time on a single background thread.
+
+    Tk may only be used from the main thread, so a job's result, and anything posted while it
+    runs, is queued and handed to its callback by an after() loop on the Tk thread.
+    """
+
+    def __init__(self, widget, lock: threading.RLock, interval: int = 50):
+        """
+        Args:
+            widget: Any Tk widget; its after() runs the callbacks.
+            lock (threading.RLock): Held while each job runs, so other threads that use the
+                scope (e.g. the live view) can't interleave commands with it.
+            interval (int, optional): How often to check for finished jobs in milliseconds.
+                Defaults to 50.
+        """
+        self.widget = widget
+        self.lock = lock
+        self.interval = interval
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scope")
+        self._calls = queue.SimpleQueue()
+        # shared by the jobs submitted since the last cancel(), so a cancel also reaches
+        # jobs that are still queued
+        self._cancel = threading.Event()
+        # the token of the running job
+        self._running_cancel = self._cancel
+        self.widget.after(self.interval, self._run_calls)
+
+    def submit(
+        self,
+        func: Callable,
+        *args,
+        on_done: Callable | None = None,
+        on_error: Callable | None = None,
+    ) -> Future:
+        """
+        Queue a job to run on the worker thread.
+
+        Args:
+            func (Callable): The job; called with args on the worker thread.
+            on_done (Callable | None, optional): Called on the Tk thread with the job's result.
+            on_error (Callable | None, optional): Called on the Tk thread with the exception
+                if the job fails. If not given, the exception is raised on the Tk thread,
+                which prints it.
+
+        Returns:
+            Future: The job's future.
+        """
+
+        cancel = self._cancel
+
+        def run():
+            self._running_cancel = cancel
+            with self.lock:
+                return func(*args)
+
+        future = self._executor.submit(run)
+        future.add_done_callback(lambda f: self.post(self._finish, f, on_done, on_error))
+        return future
+
+    def post(self, callback: Callable, *args) -> None:
+        """
+        Call callback(*args) on the Tk thread. Safe to call from any thread.
+        """
+        self._calls.put((callback, args))
+
+    def cancel(self) -> None:
+        """
+        Ask the running job and the queued ones to stop. Jobs check for this with
+        raise_if_cancelled. Jobs submitted afterwards aren't affected.
+        """
+        self._cancel.set()
+        self._cancel = threading.Event()
+
+    def raise_if_cancelled(self) -> None:
+        """
+        Called by jobs on the worker thread at points where they can stop cleanly.
+
+        Raises:
+            CaptureCancelled: If cancel was called since the job was submitted.
+        """
+        if self._running_cancel.is_set():
+            raise CaptureCancelled()
+
+    def shutdown(self) -> None:
+        """
+        Drop any queued jobs. The running job (if any) is left to finish.
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _finish(self, future: Future, on_done: Callable | None, on_error: Callable | None):
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is None:
+            if on_done is not None:
+                on_done(future.result())
+        elif on_error is not None:
+            on_error(error)
+        else:
+            raise error
+
+    def _run_calls(self) -> None:
+        # schedule the next check first, so a failing callback doesn't stop the loop
+        self.widget.after(self.interval, self._run_calls)
+        while True:
+            try:
+                callback, args = self._calls.get_nowait()
+            except queue.Empty:
+                return
+            callback(*args)